@@ -1,93 +1,246 @@
+"""
+Quality report over every generated feed.
 
+Atoms are streamed one feed at a time from output/*_atoms.json (or,
+with --db, from the knowledge base) and tokenized once each. The report
+covers counts per topic / atom type / difficulty, a read-time histogram,
+length outliers, exact duplicates (hash of the normalized text) and
+near-duplicates (atoms.near_duplicates MinHash/LSH index, same
+threshold as the curator), and is written as JSON.
+
+Usage: python analyze_atoms.py [feed.json ...] [--db] [--threshold 0.8]
+                               [--examples 10] [--out output/atom_report.json]
+"""
+import argparse
+import glob
+import hashlib
 import json
 import os
+import sys
+import time
 from collections import Counter
-import re
 
-def tokenize(text):
-    return set(re.findall(r'\w+', text.lower()))
+from atoms.atom_curator import NEAR_DUP_THRESHOLD
+from atoms.near_duplicates import NearDuplicateIndex, shingles, tokenize
+from storage.run_manifest import atomic_write_json
+
+FEED_GLOB = os.path.join("output", "*_atoms.json")
+REPORT_PATH = os.path.join("output", "atom_report.json")
+
+# Histogram bin lower edges (seconds); the last bin is open-ended
+READ_TIME_BINS = [0, 10, 20, 30, 45, 60, 90]
+
+SHORT_WORDS = 5
+LONG_WORDS = 50
+PREVIEW_CHARS = 80
+
+
+# ---------------------------------------------------------
+# Sources
+# ---------------------------------------------------------
+
+def iter_feed_files(paths):
+    """
+    Atoms of each feed file in turn; only one file is loaded at a time.
+    """
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                feed = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ANALYZE] Skipping {path}: {e}", file=sys.stderr)
+            continue
+        topic = feed.get("topic") if isinstance(feed, dict) else None
+        for atom in (feed.get("atoms", []) if isinstance(feed, dict) else []):
+            if isinstance(atom, dict):
+                atom.setdefault("topic", topic)
+                yield atom
+
+
+def iter_db_atoms():
+    from storage.knowledge_base import get_knowledge_base
+    return get_knowledge_base().iter_atoms()
+
+
+# ---------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------
+
+def _bin_label(seconds):
+    label = None
+    for lo, hi in zip(READ_TIME_BINS, READ_TIME_BINS[1:] + [None]):
+        if seconds >= lo:
+            label = f"{lo}+" if hi is None else f"{lo}-{hi - 1}"
+    return label or f"<{READ_TIME_BINS[0]}"
+
+
+def _ref(atom, content):
+    return {
+        "topic": atom.get("topic"),
+        "concept": atom.get("concept"),
+        "atom_type": atom.get("atom_type"),
+        "order": atom.get("order"),
+        "preview": content[:PREVIEW_CHARS]
+    }
+
+
+def analyze(atoms, threshold=NEAR_DUP_THRESHOLD, max_examples=10):
+    """
+    Single pass over an iterable of atom dicts; returns the report dict.
+    """
+    start = time.perf_counter()
 
-def jaccard_similarity(text1, text2):
-    t1 = tokenize(text1)
-    t2 = tokenize(text2)
-    if not t1 or not t2:
-        return 0.0
-    return len(t1.intersection(t2)) / len(t1.union(t2))
+    topics = Counter()
+    types = Counter()
+    difficulty = Counter()
+    read_hist = Counter()
+    read_missing = 0
+    read_sum = 0
+    read_n = 0
+    read_min = read_max = None
+    words_total = 0
+    very_short = very_long = empty = 0
 
-def analyze_atoms(file_path):
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
+    exact = {}          # digest → refs
+    index = NearDuplicateIndex(threshold)
+    index_refs = []     # index id → ref
+    total = 0
+
+    for atom in atoms:
+        total += 1
+        content = atom.get("content") or ""
+        if isinstance(content, list):
+            content = "\n".join(str(c) for c in content)
+
+        topics[atom.get("topic") or "unknown"] += 1
+        types[atom.get("atom_type") or "unknown"] += 1
+        difficulty[atom.get("difficulty") or "unknown"] += 1
+
+        t = atom.get("estimated_read_time_sec")
+        if isinstance(t, (int, float)) and not isinstance(t, bool):
+            read_hist[_bin_label(t)] += 1
+            read_sum += t
+            read_n += 1
+            read_min = t if read_min is None else min(read_min, t)
+            read_max = t if read_max is None else max(read_max, t)
+        else:
+            read_missing += 1
+
+        # the only tokenization of this atom
+        words = tokenize(content)
+        words_total += len(words)
+        if not words:
+            empty += 1
+            continue
+        very_short += len(words) < SHORT_WORDS
+        very_long += len(words) > LONG_WORDS
+
+        ref = _ref(atom, content)
+        digest = hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+        if digest in exact:
+            # exact copies are reported once; only the first is indexed
+            exact[digest].append(ref)
+            continue
+        exact[digest] = [ref]
+
+        index.add_shingles(shingles(words))
+        index_refs.append(ref)
+
+    exact_groups = [refs for refs in exact.values() if len(refs) > 1]
+    near_groups = [[index_refs[i] for i in c] for c in index.clusters()]
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "totals": {
+            "atoms": total,
+            "topics": len(topics),
+            "empty_content": empty
+        },
+        "topics": dict(topics.most_common()),
+        "atom_types": dict(types.most_common()),
+        "difficulty": dict(difficulty.most_common()),
+        "read_time_sec": {
+            "histogram": {
+                _bin_label(lo): read_hist.get(_bin_label(lo), 0) for lo in READ_TIME_BINS
+            },
+            "missing": read_missing,
+            "mean": round(read_sum / read_n, 2) if read_n else None,
+            "min": read_min,
+            "max": read_max
+        },
+        "length_words": {
+            "mean": round(words_total / total, 2) if total else None,
+            f"under_{SHORT_WORDS}": very_short,
+            f"over_{LONG_WORDS}": very_long
+        },
+        "exact_duplicates": {
+            "groups": len(exact_groups),
+            "redundant_atoms": sum(len(g) - 1 for g in exact_groups),
+            "examples": exact_groups[:max_examples]
+        },
+        "near_duplicates": {
+            "threshold": threshold,
+            "clusters": len(near_groups),
+            "redundant_atoms": sum(len(g) - 1 for g in near_groups),
+            "comparisons": index.comparisons,
+            "examples": near_groups[:max_examples]
+        },
+        "elapsed_sec": round(time.perf_counter() - start, 3)
+    }
+
+
+def print_summary(report):
+    totals = report["totals"]
+    print(f"[ANALYZE] {totals['atoms']} atoms across {totals['topics']} topics")
+    print("[ANALYZE] Types: " + ", ".join(f"{k}={v}" for k, v in report["atom_types"].items()))
+    rt = report["read_time_sec"]
+    print(f"[ANALYZE] Read time: mean {rt['mean']}s, min {rt['min']}, max {rt['max']}, missing {rt['missing']}")
+    ed, nd = report["exact_duplicates"], report["near_duplicates"]
+    print(f"[ANALYZE] Exact duplicates: {ed['groups']} groups ({ed['redundant_atoms']} redundant atoms)")
+    print(
+        f"[ANALYZE] Near duplicates (Jaccard >= {nd['threshold']}): "
+        f"{nd['clusters']} clusters ({nd['redundant_atoms']} redundant atoms)"
+    )
+    print(f"[ANALYZE] Done in {report['elapsed_sec']}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit generated atom feeds.")
+    parser.add_argument("feeds", nargs="*",
+                        help=f"feed files (default: {FEED_GLOB})")
+    parser.add_argument("--db", action="store_true",
+                        help="read atoms from the knowledge base instead of feed files")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUP_THRESHOLD,
+                        help="word 3-shingle Jaccard for near-duplicates")
+    parser.add_argument("--examples", type=int, default=10,
+                        help="duplicate groups listed per section")
+    parser.add_argument("--out", default=REPORT_PATH,
+                        help="report path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        atoms = iter_db_atoms()
+        source = "knowledge_base"
+    else:
+        paths = args.feeds or sorted(glob.glob(FEED_GLOB))
+        if not paths:
+            print(f"[ANALYZE] No feeds found ({FEED_GLOB}).", file=sys.stderr)
+            return
+        atoms = iter_feed_files(paths)
+        source = paths
+
+    report = analyze(atoms, args.threshold, args.examples)
+    report["source"] = source
+
+    if args.out == "-":
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
         return
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    atoms = data.get("atoms", [])
-    print(f"Total Atoms: {len(atoms)}")
-    
-    # 1. Type Distribution
-    types = Counter(a.get("atom_type", "unknown") for a in atoms)
-    print("\nAtom Types:")
-    for t, c in types.items():
-        print(f"  - {t}: {c}")
-
-    # 2. Content Analysis
-    contents = [a.get("content", "") for a in atoms]
-    
-    # Exact Duplicates
-    duplicates = [item for item, count in Counter(contents).items() if count > 1]
-    print(f"\nExact Duplicates: {len(duplicates)}")
-    for d in duplicates:
-        print(f"  - {d[:50]}...")
-
-    # Near Duplicates (Jaccard > 0.8)
-    print("\nNear Duplicates (Jaccard > 0.8):")
-    seen = set()
-    near_dupes = 0
-    for i in range(len(contents)):
-        for j in range(i + 1, len(contents)):
-            if i in seen or j in seen:
-                continue
-            sim = jaccard_similarity(contents[i], contents[j])
-            if sim > 0.8:
-                print(f"  - [{sim:.2f}] '{contents[i][:30]}...' vs '{contents[j][:30]}...'")
-                near_dupes += 1
-                seen.add(j)
-    
-    if near_dupes == 0:
-        print("  None found.")
-
-    # 3. Read Time Analysis
-    times = [a.get("estimated_read_time_sec", 0) for a in atoms]
-    if times:
-        avg_time = sum(times) / len(times)
-        print(f"\nAverage Read Time: {avg_time:.2f} sec")
-        print(f"Max Read Time: {max(times)} sec")
-        print(f"Min Read Time: {min(times)} sec")
-
-    # 4. Learning Quality Heuristics (Simple)
-    # Check for variety in start words, length, etc.
-    print("\nQuality Heuristics:")
-    short_atoms = sum(1 for c in contents if len(c.split()) < 5)
-    print(f"  - Very short atoms (< 5 words): {short_atoms}")
-    
-    long_atoms = sum(1 for c in contents if len(c.split()) > 50)
-    print(f"  - Very long atoms (> 50 words): {long_atoms}")
+    atomic_write_json(args.out, report)
+    print_summary(report)
+    print(f"[ANALYZE] Report → {args.out}")
+
 
 if __name__ == "__main__":
-    # Try both potential paths
-    paths = [
-        "output/stack_in_data_structure_atoms.json",
-        "d:/code/scrolla/output/stack_in_data_structure_atoms.json"
-    ]
-    
-    found = False
-    for p in paths:
-        if os.path.exists(p):
-            print(f"Analyzing: {p}")
-            analyze_atoms(p)
-            found = True
-            break
-    
-    if not found:
-        print("Could not find the atom file in expected locations.")
+    main()
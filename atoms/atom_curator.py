@@ -1,5 +1,12 @@
 from collections import OrderedDict
 
+from atoms.near_duplicates import NearDuplicateIndex
+from process.models import AtomFeed
+
+# Word 3-shingle Jaccard at or above which two atoms count as the same
+# text, whatever their concept/type. None turns the check off.
+NEAR_DUP_THRESHOLD = 0.8
+
 # -------------------------------
 # Helpers
 # -------------------------------
@@ -22,47 +29,63 @@ def clean_quick_check(text: str):
     return text
 
 
+def drop_near_duplicates(atoms, threshold=NEAR_DUP_THRESHOLD):
+    """
+    Keep one atom per cluster of near-identical contents (the longest,
+    first on ties); input order is preserved.
+    """
+    index = NearDuplicateIndex(threshold)
+    for atom in atoms:
+        index.add(atom.content)
+
+    dropped = set()
+    for cluster in index.clusters():
+        best = max(cluster, key=lambda i: (len(atoms[i].content), -i))
+        dropped.update(i for i in cluster if i != best)
+
+    if dropped:
+        print(f"[CURATOR] Dropped {len(dropped)} near-duplicate atoms")
+    return [a for i, a in enumerate(atoms) if i not in dropped]
+
+
 # -------------------------------
 # Core Curator
 # -------------------------------
 
-def curate_atoms(atom_feed: dict):
+def curate_atoms(atom_feed, near_dup_threshold=NEAR_DUP_THRESHOLD):
     """
-    Input: {
-        "topic": str,
-        "atoms": [ { atom }, ... ]
-    }
-    Output: same structure, but curated
+    Input: AtomFeed (or its dict form {"topic": str, "atoms": [...]})
+    Output: AtomFeed, curated
     """
 
-    topic = atom_feed["topic"]
-    atoms = atom_feed["atoms"]
+    feed = AtomFeed.coerce(atom_feed)
 
     # (concept, atom_type) → atom
     deduped = OrderedDict()
 
-    for atom in atoms:
-        concept = atom.get("concept")
-        atom_type = atom.get("atom_type")
-
-        key = (concept.lower(), atom_type)
+    for atom in feed.atoms:
+        key = (atom.concept.lower(), atom.atom_type)
 
-        content = normalize_text(atom.get("content", ""))
+        content = normalize_text(atom.content)
 
         # Quick check sanitization
-        if atom_type == "quick_check":
+        if atom.atom_type == "quick_check":
             content = clean_quick_check(content)
 
-        atom["content"] = content
+        atom.content = content
 
         # Keep the better version if duplicate
         if key in deduped:
             existing = deduped[key]
-            if len(content) > len(existing["content"]):
+            if len(content) > len(existing.content):
                 deduped[key] = atom
         else:
             deduped[key] = atom
 
+    atoms = list(deduped.values())
+    if near_dup_threshold is not None:
+        atoms = drop_near_duplicates(atoms, near_dup_threshold)
+
     # -------------------------------
     # Enforce learning order
     # -------------------------------
@@ -78,18 +101,15 @@ def curate_atoms(atom_feed: dict):
     ]
 
     sorted_atoms = sorted(
-        deduped.values(),
+        atoms,
         key=lambda a: (
-            a["concept"].lower(),
-            ORDER.index(a["atom_type"]) if a["atom_type"] in ORDER else 99
+            a.concept.lower(),
+            ORDER.index(a.atom_type) if a.atom_type in ORDER else 99
         )
     )
 
     # Reassign order cleanly
     for idx, atom in enumerate(sorted_atoms, start=1):
-        atom["order"] = idx
+        atom.order = idx
 
-    return {
-        "topic": topic,
-        "atoms": sorted_atoms
-    }
+    return AtomFeed(feed.topic, sorted_atoms)
@@ -1,4 +1,4 @@
-from process.llm_extractor import run_llm_text
+from process import llm_client
 
 
 # -------------------------------------------------------------------
@@ -230,7 +230,7 @@ def generate_atom(topic: str, plan_item: dict, concept_knowledge: dict):
         knowledge=knowledge
     )
 
-    raw_text = run_llm_text(prompt)
+    raw_text = llm_client.generate(prompt)
     text = normalize_text(raw_text)
 
     return {
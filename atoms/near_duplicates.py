@@ -0,0 +1,182 @@
+"""
+Near-duplicate detection for atom text (MinHash + LSH banding).
+
+Each text becomes a set of word 3-shingles. A MinHash signature of
+NUM_PERM values (one-permutation hashing, one pass per text) estimates
+the Jaccard similarity of two sets; the signature is cut into BANDS
+bands and only texts that share a whole band with an earlier text are
+compared. Candidates are then checked
+with the exact shingle Jaccard, so the threshold is honoured exactly
+and LSH only decides which pairs are looked at. Clusters are the
+connected components of the verified pairs (union-find).
+
+With 64 values in 16 bands of 4 rows, a pair at Jaccard 0.8 shares a
+band with probability ~0.9996 and a pair at 0.3 with ~0.12, so time is
+near-linear in the number of texts for feeds of mostly distinct atoms.
+"""
+import hashlib
+import re
+
+NUM_PERM = 64
+BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _WORD_RE.findall(text.lower())
+
+
+def shingles(words, size=SHINGLE_SIZE):
+    """
+    Word n-gram set of a token list; texts shorter than `size` words
+    become a single shingle.
+    """
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def _hash64(shingle):
+    return int.from_bytes(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(),
+        "little"
+    )
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = []
+
+    def add(self):
+        self.parent.append(len(self.parent))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            if ra < rb:
+                self.parent[rb] = ra
+            else:
+                self.parent[ra] = rb
+
+
+class NearDuplicateIndex:
+    """
+    Incremental index: add() texts (or pre-built shingle sets) one at a
+    time, then read clusters(). Ids are assigned in insertion order.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._shingles = []
+        self._uf = _UnionFind()
+        self.comparisons = 0
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def signature(self, shingle_set):
+        """
+        One-permutation MinHash: each shingle hash falls into one of
+        num_perm bins (low bits) and a bin keeps its smallest value, so
+        the cost is one pass over the shingles instead of one per
+        permutation. Empty bins copy the next filled bin (rotation
+        densification) offset by the distance, keeping bins comparable.
+        """
+        k = self.num_perm
+        sig = [None] * k
+        for sh in shingle_set:
+            h = _hash64(sh)
+            b = h % k
+            v = h // k
+            if sig[b] is None or v < sig[b]:
+                sig[b] = v
+
+        for b in range(k):
+            if sig[b] is None:
+                for step in range(1, k):
+                    v = sig[(b + step) % k]
+                    if v is not None:
+                        sig[b] = (v, step)
+                        break
+        return sig
+
+    def add(self, text):
+        return self.add_shingles(shingles(tokenize(text)))
+
+    def add_shingles(self, shingle_set):
+        """
+        Index one shingle set; returns its id and the ids of earlier
+        entries it was checked against and matched (Jaccard >= threshold).
+        Entries already in its cluster through another match are not
+        re-checked.
+        """
+        idx = len(self._shingles)
+        self._shingles.append(shingle_set)
+        self._uf.add()
+        if not shingle_set:
+            return idx, []
+
+        sig = self.signature(shingle_set)
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            key = tuple(sig[band * self.rows:(band + 1) * self.rows])
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [idx]
+            else:
+                candidates.update(bucket)
+                bucket.append(idx)
+
+        matches = []
+        for other in sorted(candidates):
+            # already joined through an earlier match
+            if self._uf.find(other) == self._uf.find(idx):
+                continue
+            self.comparisons += 1
+            if jaccard(shingle_set, self._shingles[other]) >= self.threshold:
+                self._uf.union(idx, other)
+                matches.append(other)
+        return idx, matches
+
+    def clusters(self, min_size=2):
+        """
+        Groups of ids (each sorted, groups ordered by first id) with at
+        least min_size members.
+        """
+        groups = {}
+        for i in range(len(self._shingles)):
+            groups.setdefault(self._uf.find(i), []).append(i)
+        return [g for g in groups.values() if len(g) >= min_size]
+
+
+def near_duplicate_clusters(texts, threshold=DEFAULT_THRESHOLD):
+    """
+    Clusters (lists of indices into `texts`) of near-identical texts.
+    """
+    index = NearDuplicateIndex(threshold)
+    for text in texts:
+        index.add(text)
+    return index.clusters()
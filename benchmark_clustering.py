@@ -0,0 +1,99 @@
+"""
+Compare the dense agglomerative path with the LSH neighbour-graph path
+of intelligence.semantic_normalizer.cluster_labels on synthetic
+embeddings (tight groups of concept variants on the unit sphere).
+
+Tight groups are easy: variants are well inside the threshold and merge
+transitively. The recall columns plant isolated pairs at a fixed cosine
+just inside the threshold and report how often each pair ends up in one
+cluster, which is where LSH misses show.
+
+Usage: python benchmark_clustering.py [n1 n2 ...]
+"""
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from intelligence.semantic_normalizer import cluster_labels
+
+DIM = 384               # all-MiniLM-L6-v2 output size
+VARIANTS_PER_GROUP = 4
+NOISE = 0.4             # norm of the per-variant offset
+THRESHOLD = 0.35
+PLANTED_PAIRS = 200
+PAIR_COSINES = [0.7, 0.8]
+
+
+def synthetic_embeddings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = max(1, n // VARIANTS_PER_GROUP)
+    centers = rng.standard_normal((groups, DIM)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    truth = rng.integers(0, groups, size=n)
+    offsets = rng.standard_normal((n, DIM)).astype(np.float32) * (NOISE / np.sqrt(DIM))
+    return centers[truth] + offsets, truth
+
+
+def plant_pairs(x, cosine, count=PLANTED_PAIRS, seed=1):
+    """
+    Overwrite the last 2*count rows with isolated pairs at exactly
+    `cosine`; returns the new matrix and the (i, j) row pairs.
+    """
+    rng = np.random.default_rng(seed)
+    x = x.copy()
+    n = len(x)
+    count = min(count, n // 4)
+    pairs = []
+    for k in range(count):
+        i, j = n - 2 * k - 1, n - 2 * k - 2
+        u = rng.standard_normal(DIM)
+        u /= np.linalg.norm(u)
+        w = rng.standard_normal(DIM)
+        w -= (w @ u) * u
+        w /= np.linalg.norm(w)
+        x[i] = u
+        x[j] = cosine * u + np.sqrt(1 - cosine ** 2) * w
+        pairs.append((i, j))
+    return x, pairs
+
+
+def pair_recall(labels, pairs):
+    return sum(labels[i] == labels[j] for i, j in pairs) / len(pairs) if pairs else float("nan")
+
+
+def run(method, x):
+    start = time.perf_counter()
+    labels = cluster_labels(x, THRESHOLD, method=method)
+    return labels, time.perf_counter() - start
+
+
+def main(sizes):
+    recall_cols = " ".join(f"{'recall@' + format(c, '.2f'):>12}" for c in PAIR_COSINES)
+    print(f"{'n':>7} {'method':>14} {'time_s':>8} {'clusters':>9} {'ARI_truth':>10} "
+          f"{'ARI_vs_dense':>13} {recall_cols}")
+    for n in sizes:
+        x, truth = synthetic_embeddings(n)
+        planted = [plant_pairs(x, c) for c in PAIR_COSINES]
+
+        def recalls(method):
+            return " ".join(
+                f"{pair_recall(run(method, px)[0], pairs):>12.3f}" for px, pairs in planted
+            )
+
+        dense = None
+        if n <= 5000:
+            dense, t = run("agglomerative", x)
+            print(f"{n:>7} {'agglomerative':>14} {t:>8.3f} {len(set(dense)):>9} "
+                  f"{adjusted_rand_score(truth, dense):>10.3f} {'-':>13} {recalls('agglomerative')}")
+
+        graph, t = run("graph", x)
+        vs_dense = f"{adjusted_rand_score(dense, graph):.3f}" if dense is not None else "-"
+        print(f"{n:>7} {'graph':>14} {t:>8.3f} {len(set(graph)):>9} "
+              f"{adjusted_rand_score(truth, graph):>10.3f} {vs_dense:>13} {recalls('graph')}")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [200, 1000, 3000, 20000]
+    main(sizes)
@@ -0,0 +1,180 @@
+"""
+Compare process.json_scanner.scan_json with the previous recovery chain
+(json.loads → regex clean-up → ast.literal_eval) on malformed LLM output.
+
+The corpus is every *.json / *.txt file in --corpus. Dumped samples
+(json_scanner.DUMP_SAMPLES = True during a real run) are JSON files with
+the raw response under "text"; any other file is read as raw text. When
+the folder is empty, a synthetic corpus with the usual defects (fences,
+trailing/missing commas, single quotes, bad escapes, stray quotes,
+truncation) is generated instead. Truncated samples are rejected by
+the scanner on purpose (see scan_json's allow_truncated), so they count
+as unparsed for both parsers.
+
+Usage: python benchmark_json.py [--corpus output/llm_failures] [--repeat 20]
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import random
+import re
+import time
+from collections import Counter
+
+from process.json_scanner import SAMPLE_DIR, scan_json
+
+
+# ---------------------------------------------------------
+# Baseline: the parser this module replaced
+# ---------------------------------------------------------
+
+def legacy_clean_json_text(text):
+    text = re.sub(r'```json\s*', '', text)
+    text = re.sub(r'```\s*', '', text)
+    text = re.sub(r'\\(?![\\"/bfnrtu])', r'\\\\', text)
+    text = re.sub(r'(?<=[}\]"\'0-9])\s+(?=["{\[])', ', ', text)
+    return text
+
+
+def legacy_parse_json_garbage(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    cleaned = legacy_clean_json_text(text)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+
+    for t in [text, cleaned]:
+        try:
+            return ast.literal_eval(t)
+        except (ValueError, SyntaxError):
+            pass
+
+    raise ValueError("Failed to parse JSON with all available methods.")
+
+
+# ---------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------
+
+def load_corpus(directory):
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json")) +
+                       glob.glob(os.path.join(directory, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        if path.endswith(".json"):
+            try:
+                record = json.loads(raw)
+                if isinstance(record, dict) and isinstance(record.get("text"), str):
+                    raw = record["text"]
+            except ValueError:
+                pass
+        samples.append((os.path.basename(path), raw))
+    return samples
+
+
+ATOM_TYPES = ["explanation", "mental_model", "example", "key_points", "pitfall"]
+
+
+def _clean_bundle(rng):
+    return [
+        {
+            "atom_type": t,
+            "content": f"A {t} about node {rng.randint(1, 99)}: it points to the next one."
+        }
+        for t in rng.sample(ATOM_TYPES, rng.randint(3, 5))
+    ]
+
+
+def _defects():
+    def fence(s): return "```json\n" + s + "\n```"
+    def prose(s): return "Sure! Here are the atoms:\n" + s + "\nHope this helps."
+    def trailing_comma(s): return s.replace("}\n]", "},\n]").replace('"\n  }', '",\n  }')
+    def missing_comma(s): return s.replace("},\n  {", "}\n  {")
+    def single_quotes(s): return s.replace('"', "'")
+    def bad_escape(s): return s.replace("next one", "next\\_one \\d")
+    def stray_quote(s): return s.replace("it points", 'it "points"')
+    def python_literals(s): return s.replace("]", ', {"done": True}]', 1)
+    def truncated(s): return s[:int(len(s) * 0.8)]
+    return [fence, prose, trailing_comma, missing_comma, single_quotes,
+            bad_escape, stray_quote, python_literals, truncated]
+
+
+def synthetic_corpus(n=200, seed=7):
+    rng = random.Random(seed)
+    defects = _defects()
+    samples = []
+    for i in range(n):
+        text = json.dumps(_clean_bundle(rng), indent=2)
+        applied = rng.sample(defects, rng.randint(1, 3))
+        for defect in applied:
+            text = defect(text)
+        samples.append((f"synthetic-{i}:" + "+".join(d.__name__ for d in applied), text))
+    return samples
+
+
+# ---------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------
+
+def _time(parse, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            result = parse(text)
+        except Exception:
+            result = None
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tolerant JSON scanner.")
+    parser.add_argument("--corpus", default=SAMPLE_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--verbose", action="store_true", help="list samples only one parser handled")
+    args = parser.parse_args(argv)
+
+    samples = load_corpus(args.corpus) if os.path.isdir(args.corpus) else []
+    source = args.corpus
+    if not samples:
+        samples = synthetic_corpus()
+        source = "synthetic"
+
+    legacy_ok = scanner_ok = 0
+    legacy_time = scanner_time = 0.0
+    repairs = Counter()
+
+    for name, text in samples:
+        legacy, t_legacy = _time(legacy_parse_json_garbage, text, args.repeat)
+        scanned, t_scan = _time(scan_json, text, args.repeat)
+
+        legacy_time += t_legacy
+        scanner_time += t_scan
+        legacy_ok += legacy is not None
+        if scanned is not None:
+            scanner_ok += 1
+            repairs.update(scanned[1])
+
+        if args.verbose and (legacy is None) != (scanned is None):
+            winner = "scanner" if scanned is not None else "legacy"
+            print(f"  only {winner}: {name}")
+
+    n = len(samples)
+    print(f"Corpus: {source} ({n} samples)")
+    print(f"{'parser':>8} {'parsed':>8} {'rate':>7} {'mean_us':>9}")
+    print(f"{'legacy':>8} {legacy_ok:>8} {legacy_ok / n:>7.1%} {legacy_time / n * 1e6:>9.1f}")
+    print(f"{'scanner':>8} {scanner_ok:>8} {scanner_ok / n:>7.1%} {scanner_time / n * 1e6:>9.1f}")
+    print("\nRepairs applied by the scanner:")
+    for repair, count in repairs.most_common():
+        print(f"  {repair:<16} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Shared HTTP session with an on-disk response cache for source fetchers.
+
+Cached pages are revalidated with conditional GETs (If-None-Match /
+If-Modified-Since); a 304 reuses the stored body. Pages validated within
+FRESH_FOR_SEC are served straight from disk with no request at all.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = os.path.join("output", "http_cache")
+FRESH_FOR_SEC = 24 * 3600
+POOL_SIZE = 8
+USER_AGENT = "scrolla/1.0 (learning feed generator)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _cache_path(url: str) -> str:
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def _load_entry(url: str):
+    path = _cache_path(url)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_entry(url: str, entry: dict):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, _cache_path(url))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def cached_get(url: str, timeout=10, fresh_for=FRESH_FOR_SEC):
+    """
+    GET through the shared session and disk cache.
+    Returns (status_code, text). Network errors propagate to the caller.
+    """
+    entry = _load_entry(url)
+    now = time.time()
+
+    if entry and fresh_for and now - entry.get("validated_at", 0) < fresh_for:
+        return entry["status"], entry["text"]
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    r = get_session().get(url, headers=headers, timeout=timeout)
+
+    if r.status_code == 304 and entry:
+        entry["validated_at"] = now
+        _store_entry(url, entry)
+        return entry["status"], entry["text"]
+
+    if r.status_code == 200:
+        _store_entry(url, {
+            "url": url,
+            "status": r.status_code,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "validated_at": now,
+            "text": r.text
+        })
+
+    return r.status_code, r.text
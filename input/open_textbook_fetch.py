@@ -1,14 +1,13 @@
-import requests
+from input.http_cache import cached_get
 
 OPEN_DS_URL = "https://opendatastructures.org/ods-python/"
 
-def fetch_open_textbook(topic: str) -> str:
+def fetch_open_textbook(topic: str, timeout=10) -> str:
     try:
-        # very simple heuristic: fetch index page
-        r = requests.get(OPEN_DS_URL, timeout=10)
-        if r.status_code != 200:
+        # very simple heuristic: fetch index page (cached across topics)
+        status, text = cached_get(OPEN_DS_URL, timeout=timeout)
+        if status != 200:
             return ""
-        text = r.text
 
         # lightweight filtering
         if topic.lower() in text.lower():
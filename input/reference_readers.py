@@ -1,21 +1,23 @@
-import requests
+from input.http_cache import cached_get
 
-def fetch_reference(url):
+GEEKSFORGEEKS_URL = "https://www.geeksforgeeks.org/{slug}/"
+
+def fetch_reference(url, timeout=10):
     try:
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
+        status, text = cached_get(url, timeout=timeout)
+        if status != 200:
             return ""
-        return r.text[:3000]  # HARD LIMIT
+        return text[:3000]  # HARD LIMIT
     except Exception:
         return ""
 
-def fetch_geeksforgeeks(topic):
+def fetch_geeksforgeeks(topic, timeout=10):
     q = topic.replace(" ", "-")
-    url = f"https://www.geeksforgeeks.org/{q}/"
-    return fetch_reference(url)
+    url = GEEKSFORGEEKS_URL.format(slug=q)
+    return fetch_reference(url, timeout=timeout)
 
-def fetch_w3schools(topic):
+def fetch_w3schools(topic, timeout=10):
     return ""  # w3schools URLs vary heavily
 
-def fetch_tutorialspoint(topic):
+def fetch_tutorialspoint(topic, timeout=10):
     return ""  # handled similarly
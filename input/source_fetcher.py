@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from input.wiki_fetch import fetch_wikipedia_text
+from input.open_textbook_fetch import fetch_open_textbook
+from input.reference_readers import (
+    fetch_geeksforgeeks,
+    fetch_w3schools,
+    fetch_tutorialspoint
+)
+
+# Seconds each source may take before we give up on it
+SOURCE_TIMEOUTS = {
+    "wikipedia": 30,
+    "open_textbook": 10,
+    "geeksforgeeks": 10,
+    "w3schools": 10,
+    "tutorialspoint": 10
+}
+
+REFERENCE_FETCHERS = {
+    "geeksforgeeks": fetch_geeksforgeeks,
+    "w3schools": fetch_w3schools,
+    "tutorialspoint": fetch_tutorialspoint
+}
+
+
+def fetch_all_sources(topic: str, timeouts=None):
+    """
+    Fetch every source concurrently; total time is bounded by the slowest
+    source (or its timeout), not the sum.
+
+    Returns (wiki_text, textbook_text, refs_dict). A source that fails or
+    times out contributes "".
+    """
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+
+    jobs = {
+        # the wikipedia package makes its own requests; only the deadline applies
+        "wikipedia": lambda: fetch_wikipedia_text(topic),
+        "open_textbook": lambda: fetch_open_textbook(
+            topic, timeout=timeouts["open_textbook"]
+        )
+    }
+    for name, fetcher in REFERENCE_FETCHERS.items():
+        jobs[name] = (
+            lambda f=fetcher, n=name: f(topic, timeout=timeouts[n])
+        )
+
+    results = {}
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(jobs))
+    try:
+        futures = {name: executor.submit(job) for name, job in jobs.items()}
+
+        for name, future in futures.items():
+            remaining = started + timeouts[name] - time.monotonic()
+            try:
+                results[name] = future.result(timeout=max(0, remaining)) or ""
+            except Exception as e:
+                print(f"[WARN] Source {name} failed or timed out: {e!r}")
+                results[name] = ""
+    finally:
+        # stragglers past their deadline are abandoned, not awaited
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    print(f"[TIME] Sources fetched in {time.monotonic() - started:.1f}s")
+
+    refs = {name: results[name] for name in REFERENCE_FETCHERS}
+    return results["wikipedia"], results["open_textbook"], refs
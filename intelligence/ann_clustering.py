@@ -0,0 +1,137 @@
+"""
+Approximate neighbour-graph clustering for large concept pools.
+
+Average-linkage agglomerative clustering needs a dense n x n distance
+matrix. Here candidate neighbours come from random-hyperplane LSH tables
+instead: only vectors that share a bucket are compared, pairs within
+`distance_threshold` (cosine) become edges, and clusters are the
+connected components of that graph (union-find).
+
+This is single-linkage at the same threshold, so a long chain of close
+concepts can merge where average linkage would split it; in exchange,
+memory is O(n) and time is near-linear for well-spread embeddings.
+
+Buckets need more hyperplanes as n grows, and each extra bit lowers the
+chance that a close pair shares a bucket. The number of tables therefore
+grows with the bits so that a pair exactly at the threshold is found
+with probability TARGET_RECALL (a random hyperplane splits two vectors
+at angle theta with probability theta / pi).
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+MIN_TABLES = 8
+MAX_TABLES = 256
+TARGET_RECALL = 0.95
+TARGET_BUCKET_SIZE = 64
+SEED = 13
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            if ra < rb:
+                self.parent[rb] = ra
+            else:
+                self.parent[ra] = rb
+
+
+def _normalize_rows(embeddings):
+    x = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def tables_for_recall(min_sim, bits_per_table, target=TARGET_RECALL):
+    """
+    Tables needed so a pair at cosine similarity `min_sim` shares a
+    bucket in at least one of them with probability `target`.
+    """
+    angle = np.arccos(np.clip(min_sim, -1.0, 1.0))
+    per_table = (1.0 - angle / np.pi) ** bits_per_table
+    if per_table >= 1.0:
+        return MIN_TABLES
+    if per_table <= 0.0:
+        return MAX_TABLES
+    needed = int(np.ceil(np.log(1.0 - target) / np.log(1.0 - per_table)))
+    return int(np.clip(needed, MIN_TABLES, MAX_TABLES))
+
+
+def neighbor_graph_labels(
+    embeddings,
+    distance_threshold=0.35,
+    num_tables=None,
+    bits_per_table=None,
+    seed=SEED
+):
+    """
+    Cluster labels (0..k-1, numbered by first appearance) for the rows of
+    `embeddings`, joining rows whose cosine distance <= distance_threshold
+    when LSH puts them in a common bucket. By default each table gets
+    enough hyperplanes for buckets of roughly TARGET_BUCKET_SIZE rows,
+    and there are enough tables for TARGET_RECALL at the threshold.
+    """
+    x = _normalize_rows(embeddings)
+    n = len(x)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if bits_per_table is None:
+        bits_per_table = int(np.clip(np.log2(max(1, n / TARGET_BUCKET_SIZE)), 1, 24))
+
+    min_sim = 1.0 - distance_threshold
+    if num_tables is None:
+        num_tables = tables_for_recall(min_sim, bits_per_table)
+    rng = np.random.default_rng(seed)
+    uf = _UnionFind(n)
+    weights = 1 << np.arange(bits_per_table, dtype=np.int64)
+
+    for _ in range(num_tables):
+        planes = rng.standard_normal((x.shape[1], bits_per_table)).astype(np.float32)
+        codes = ((x @ planes) > 0).astype(np.int64) @ weights
+
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [n]))
+
+        for start, end in zip(starts, ends):
+            if end - start < 2:
+                continue
+            members = order[start:end]
+            block = x[members]
+            adjacency = (block @ block.T) >= min_sim
+
+            # link each in-bucket component with a chain of m-1 unions
+            k, local = connected_components(csr_matrix(adjacency), directed=False)
+            if k == len(members):
+                continue
+            first = {}
+            for pos, label in enumerate(local):
+                if label in first:
+                    uf.union(int(members[first[label]]), int(members[pos]))
+                else:
+                    first[label] = pos
+
+    labels = np.empty(n, dtype=np.int64)
+    remap = {}
+    for i in range(n):
+        root = uf.find(i)
+        if root not in remap:
+            remap[root] = len(remap)
+        labels[i] = remap[root]
+    return labels
@@ -1,19 +1,107 @@
-from collections import defaultdict
+import re
+from collections import defaultdict, deque
 
+from process.concept_normalizer import normalize_concept_name
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _knowledge_text(value):
+    """
+    Flatten every string inside a knowledge value (str, list, dict).
+    """
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [t for v in value.values() for t in _knowledge_text(v)]
+    if isinstance(value, (list, tuple)):
+        return [t for v in value for t in _knowledge_text(v)]
+    return []
+
+
+def _stemmed_tokens(text):
+    # normalize_concept_name is cached, so repeated words are cheap
+    return [normalize_concept_name(w) for w in _WORD_RE.findall(text.lower())]
+
+
+class _WordAutomaton:
+    """
+    Aho–Corasick automaton over word tokens. Matching whole tokens gives
+    word-boundary semantics for free ("stack" never matches "stacked"
+    unless both stem the same).
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [set()]
+
+    def add(self, words, value):
+        state = 0
+        for w in words:
+            nxt = self.goto[state].get(w)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][w] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(set())
+            state = nxt
+        self.out[state].add(value)
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for w, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and w not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(w, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def scan(self, tokens):
+        state = 0
+        for w in tokens:
+            while state and w not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(w, 0)
+            if self.out[state]:
+                yield from self.out[state]
+
+
+def build_weighted_concept_graph(concepts):
+    """
+    One pass over each concept's knowledge text (all string and list
+    fields) with a single automaton of every stemmed concept name.
+
+    Returns (graph, weights): graph[name] is the set of other concepts
+    mentioned in name's knowledge; weights[(name, other)] is how many
+    times it was mentioned.
+    """
+    automaton = _WordAutomaton()
+    for c in concepts:
+        words = _stemmed_tokens(c["concept"])
+        if words:
+            automaton.add(tuple(words), c["concept"])
+    automaton.build()
 
-def build_concept_graph(concepts):
     graph = defaultdict(set)
+    weights = defaultdict(int)
 
     for c in concepts:
-        text = " ".join(
-            v for v in c["knowledge"].values()
-            if isinstance(v, str)
-        ).lower()
+        name = c["concept"]
+        for text in _knowledge_text(c.get("knowledge", {})):
+            for other in automaton.scan(_stemmed_tokens(text)):
+                if other == name:
+                    continue
+                graph[name].add(other)
+                weights[(name, other)] += 1
 
-        for other in concepts:
-            if c == other:
-                continue
-            if other["concept"].lower() in text:
-                graph[c["concept"]].add(other["concept"])
+    return graph, weights
 
+
+def build_concept_graph(concepts):
+    graph, _ = build_weighted_concept_graph(concepts)
     return graph
@@ -1,22 +1,94 @@
-def select_learning_concepts(concepts, scores, max_concepts=10):
-    ranked = sorted(
-        concepts,
-        key=lambda c: scores[c["concept"]],
-        reverse=True
-    )
+import heapq
+
+# Max concepts per type (types not listed are unlimited)
+TYPE_QUOTAS = {
+    "Application": 1
+}
+
+# Score multiplier for a concept whose cluster is already represented;
+# 0.0 means "never pick two concepts from the same cluster".
+DIVERSITY_PENALTY = 0.0
+
+# Used when a concept has no generated atoms yet
+ATOMS_PER_CONCEPT = 7
+AVG_ATOM_READ_SEC = 7
+
+
+def estimate_learning_time(concept):
+    """
+    Seconds to read a concept's atoms: the sum of their estimated read
+    times when present, otherwise a per-concept default.
+    """
+    atoms = concept.get("atoms")
+    if atoms:
+        return sum(a.get("estimated_read_time_sec", AVG_ATOM_READ_SEC) for a in atoms)
+    return ATOMS_PER_CONCEPT * AVG_ATOM_READ_SEC
+
+
+def cluster_ids(clusters):
+    """
+    Map concept name -> cluster index from normalize_concepts output,
+    for selecting from a pool that has not been merged per cluster.
+    """
+    return {
+        c["concept"]: idx
+        for idx, cluster in enumerate(clusters)
+        for c in cluster
+    }
+
+
+def select_learning_concepts(
+    concepts,
+    scores,
+    max_concepts=10,
+    type_quotas=None,
+    cluster_of=None,
+    diversity_penalty=DIVERSITY_PENALTY,
+    time_budget_sec=None
+):
+    """
+    Pick up to max_concepts by score, best first, subject to per-type
+    quotas, cluster diversity and an optional learning-time budget.
+
+    Uses a heap, so only the candidates actually examined are ordered:
+    O(n + k log n) instead of a full sort of the pool.
+    """
+    quotas = TYPE_QUOTAS if type_quotas is None else type_quotas
+    cluster_of = cluster_of or {}
+
+    # index breaks ties, keeping input order like a stable sort
+    heap = [(-scores[c["concept"]], i) for i, c in enumerate(concepts)]
+    heapq.heapify(heap)
 
     final = []
-    application_count = 0
+    type_counts = {}
+    used_clusters = set()
+    penalized = set()
+    total_time = 0
 
-    for c in ranked:
-        if c["type"] == "Application":
-            if application_count >= 1:
-                continue
-            application_count += 1
+    while heap and len(final) < max_concepts:
+        neg_score, i = heapq.heappop(heap)
+        c = concepts[i]
+        ctype = c["type"]
 
-        final.append(c)
+        if ctype in quotas and type_counts.get(ctype, 0) >= quotas[ctype]:
+            continue
 
-        if len(final) >= max_concepts:
-            break
+        cluster = cluster_of.get(c["concept"])
+        if cluster is not None and cluster in used_clusters and i not in penalized:
+            if diversity_penalty > 0:
+                penalized.add(i)
+                heapq.heappush(heap, (neg_score * diversity_penalty, i))
+            continue
+
+        cost = estimate_learning_time(c)
+        if time_budget_sec is not None and total_time + cost > time_budget_sec:
+            continue
+
+        final.append(c)
+        type_counts[ctype] = type_counts.get(ctype, 0) + 1
+        total_time += cost
+        if cluster is not None:
+            used_clusters.add(cluster)
 
     return final
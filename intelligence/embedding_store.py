@@ -0,0 +1,187 @@
+"""
+Persistent embedding cache keyed by (model name, text hash).
+
+Each model gets a raw float32 matrix file that is memory-mapped for reads
+plus a key file with one sha1 per row. New vectors are appended, so
+repeat runs and other topics only pay model inference for unseen text.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+EMBEDDING_DIR = os.path.join("output", "embeddings")
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _slug(model_name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_.-]+", "_", model_name)
+
+
+class EmbeddingStore:
+    def __init__(self, model_name: str, directory=EMBEDDING_DIR):
+        self.model_name = model_name
+        base = os.path.join(directory, _slug(model_name))
+        self.directory = directory
+        self.matrix_path = base + ".f32"
+        self.keys_path = base + ".keys"
+        self.meta_path = base + ".meta.json"
+
+        self._lock = threading.Lock()
+        self.dim = None
+        self._index = {}
+        self._matrix = None
+        self._load()
+
+    # ---------------------------------------------------------
+    # Load / map
+    # ---------------------------------------------------------
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            self.dim = json.load(f)["dim"]
+
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                keys = [line.strip() for line in f if line.strip()]
+
+        # rows and keys are appended separately; trust only complete pairs
+        row_bytes = self.dim * 4
+        size = 0
+        if os.path.exists(self.matrix_path):
+            size = os.path.getsize(self.matrix_path)
+
+        n = min(len(keys), size // row_bytes)
+        if size != n * row_bytes:
+            # drop orphan rows and any half-written row so later appends
+            # stay aligned with keys
+            with open(self.matrix_path, "r+b") as f:
+                f.truncate(n * row_bytes)
+        if len(keys) > n:
+            with open(self.keys_path, "w", encoding="utf-8") as f:
+                f.write("".join(k + "\n" for k in keys[:n]))
+
+        self._index = {k: i for i, k in enumerate(keys[:n])}
+        self._remap(n)
+
+    def _remap(self, n):
+        if n == 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self.matrix_path, dtype=np.float32, mode="r", shape=(n, self.dim)
+        )
+
+    def __len__(self):
+        return len(self._index)
+
+    # ---------------------------------------------------------
+    # Read / write
+    # ---------------------------------------------------------
+
+    def lookup(self, texts):
+        """
+        Returns (rows, missing) where rows[i] is a cached vector or None
+        and missing lists the indices that need encoding.
+        """
+        rows = [None] * len(texts)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                row = self._index.get(text_key(text))
+                if row is None:
+                    missing.append(i)
+                else:
+                    rows[i] = self._matrix[row]
+        return rows, missing
+
+    def add(self, texts, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError("vectors must be a (len(texts), dim) matrix")
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"dimension mismatch: store has {self.dim}, got {vectors.shape[1]}"
+                )
+
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for text, vec in zip(texts, vectors):
+                key = text_key(text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vec)
+
+            if not new_keys:
+                return
+
+            # matrix first, keys second: a crash in between leaves
+            # orphan rows that _load() trims
+            with open(self.matrix_path, "ab") as f:
+                f.write(np.stack(new_rows).astype(np.float32).tobytes())
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(k + "\n" for k in new_keys))
+
+            start = len(self._index)
+            for offset, key in enumerate(new_keys):
+                self._index[key] = start + offset
+            self._remap(len(self._index))
+
+    def encode(self, texts, encoder, batch_size=64):
+        """
+        Embed texts, running `encoder(list_of_texts)` only for cache misses
+        (in batches), and filling the store with the new vectors.
+        Returns a float32 matrix aligned with `texts`.
+        """
+        texts = list(texts)
+        rows, missing = self.lookup(texts)
+
+        # encode each distinct missing text once
+        pending = list(dict.fromkeys(texts[i] for i in missing))
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            self.add(batch, encoder(batch))
+
+        if missing:
+            rows, missing = self.lookup(texts)
+
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.stack([np.asarray(r, dtype=np.float32) for r in rows])
+
+
+# ---------------------------------------------------------
+# One store per model
+# ---------------------------------------------------------
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_name: str) -> EmbeddingStore:
+    with _stores_lock:
+        store = _stores.get(model_name)
+        if store is None:
+            store = EmbeddingStore(model_name)
+            _stores[model_name] = store
+        return store
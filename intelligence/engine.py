@@ -1,6 +1,6 @@
 from intelligence.semantic_normalizer import normalize_concepts
-from intelligence.concept_graph import build_concept_graph
-from intelligence.concept_scorer import score_concept
+from intelligence.concept_graph import build_weighted_concept_graph
+from intelligence.concept_scorer import score_concepts
 from intelligence.cluster_merger import merge_cluster
 from intelligence.concept_selector import select_learning_concepts
 
@@ -9,11 +9,12 @@ def run_concept_intelligence(concepts):
     clusters = normalize_concepts(concepts)
 
     flattened = [c for cluster in clusters for c in cluster]
-    graph = build_concept_graph(flattened)
+    graph, weights = build_weighted_concept_graph(flattened)
 
+    score_array = score_concepts(flattened, graph, weights)
     scores = {
-        c["concept"]: score_concept(c, graph)
-        for c in flattened
+        c["concept"]: float(s)
+        for c, s in zip(flattened, score_array)
     }
 
     merged = [
@@ -21,6 +22,8 @@ def run_concept_intelligence(concepts):
         for cluster in clusters
     ]
 
+    # merged already holds one concept per cluster, so no cluster
+    # diversity constraint is needed here
     final = select_learning_concepts(merged, scores)
 
     return final
@@ -1,13 +1,65 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.cluster import AgglomerativeClustering
-import numpy as np
+import threading
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from intelligence.embedding_store import get_embedding_store
 
+MODEL_NAME = "all-MiniLM-L6-v2"
 
-def normalize_concepts(concepts, distance_threshold=0.35):
-    names = [c["concept"] for c in concepts]
-    embeddings = model.encode(names)
+# Above this many concepts the dense O(n^2) agglomerative path is
+# replaced by the LSH neighbour-graph clustering in ann_clustering.
+LARGE_POOL_THRESHOLD = 500
+
+# Loaded on first use; importing this module must stay cheap.
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(MODEL_NAME)
+        return _model
+
+
+def warm_up():
+    """
+    Load the embedding model ahead of time (e.g. on a background thread
+    while the LLM stages run) so the first normalize_concepts call is fast.
+    """
+    get_model()
+
+
+def encode_texts(texts):
+    """
+    Embed texts through the persistent embedding cache; the model is only
+    loaded and run for text it has not seen before.
+    """
+    return get_embedding_store(MODEL_NAME).encode(
+        texts,
+        lambda batch: get_model().encode(batch)
+    )
+
+
+def cluster_labels(embeddings, distance_threshold=0.35, method="auto"):
+    """
+    method: "agglomerative" (dense, average linkage), "graph" (LSH
+    neighbour graph + union-find, near-linear) or "auto" (by pool size).
+    """
+    if method == "auto":
+        method = "graph" if len(embeddings) > LARGE_POOL_THRESHOLD else "agglomerative"
+
+    if method == "graph":
+        from intelligence.ann_clustering import neighbor_graph_labels
+        return neighbor_graph_labels(embeddings, distance_threshold)
+
+    if method != "agglomerative":
+        raise ValueError(f"Unknown clustering method: {method}")
+
+    if len(embeddings) < 2:
+        return [0] * len(embeddings)
+
+    from sklearn.cluster import AgglomerativeClustering
 
     clustering = AgglomerativeClustering(
         n_clusters=None,
@@ -15,8 +67,14 @@ def normalize_concepts(concepts, distance_threshold=0.35):
         metric="cosine",
         linkage="average"
     )
+    return clustering.fit_predict(embeddings)
+
+
+def normalize_concepts(concepts, distance_threshold=0.35, method="auto"):
+    names = [c["concept"] for c in concepts]
+    embeddings = encode_texts(names)
 
-    labels = clustering.fit_predict(embeddings)
+    labels = cluster_labels(embeddings, distance_threshold, method)
 
     clusters = {}
     for label, concept in zip(labels, concepts):
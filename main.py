@@ -1,43 +1,193 @@
-from input.wiki_fetch import fetch_wikipedia_text
-from input.open_textbook_fetch import fetch_open_textbook
-from input.reference_readers import (
-    fetch_geeksforgeeks,
-    fetch_w3schools,
-    fetch_tutorialspoint
-)
+import argparse
+import time
+
+from input.source_fetcher import fetch_all_sources
 
 from storage.raw_store import save_raw
 from storage.semantic_store import save_semantic
 from storage.concept_knowledge_store import (
-    load_concept_knowledge,
-    save_concept_knowledge
+    flush_concept_knowledge,
+    release_concept_knowledge
 )
 from storage.atom_store import save_atoms
+from storage.run_manifest import RunManifest, content_hash
 
 from process.llm_extractor import extract_concepts_llm
 from process.context_builder import build_merged_raw_text
-from process.knowledge_extractor import extract_concept_knowledge
-from process.atom_bundle_generator import generate_atom_bundle
+from process.knowledge_resolver import (
+    KNOWLEDGE_WORKERS,
+    KNOWLEDGE_DEADLINE_SEC,
+    resolve_concept_knowledge_concurrent,
+    summarize_resolution
+)
+from process.atom_bundle_generator import generate_atom_bundles
+from process.pipeline import (
+    run_knowledge_atom_pipeline,
+    restore_checkpointed_knowledge,
+    knowledge_inputs_hash
+)
+from process import structured_output
+from process.llm_client import get_client
+from process.models import Atom, AtomFeed, Concept
+from process.json_scanner import repair_stats
 
+# Overlap steps 4 and 5: each concept goes to atom generation as soon as
+# its knowledge resolves.
+PIPELINE_STAGES = True
 
-def main():
-    topic = input("Enter topic: ").strip()
-    if not topic:
-        return
+
+def _resolve_then_generate(topic, valid_concepts, merged_raw, manifest):
+    """
+    Steps 4 and 5 one after the other. Returns (atoms, resolution
+    report); atoms is None when there is nothing to build.
+    """
+    restore_checkpointed_knowledge(manifest, topic, valid_concepts, merged_raw)
 
     # --------------------------------------------------
-    # 1. Fetch sources
+    # 4. Resolve concept knowledge (CACHE → LLM, bounded workers)
+    # ORDER IS PRESERVED: results follow valid_concepts order
     # --------------------------------------------------
-    print("[1] Fetching sources...")
-    wiki = fetch_wikipedia_text(topic)
-    textbook = fetch_open_textbook(topic)
-
-    refs = {
-        "geeksforgeeks": fetch_geeksforgeeks(topic),
-        "w3schools": fetch_w3schools(topic),
-        "tutorialspoint": fetch_tutorialspoint(topic)
+    print(f"[4] Resolving concept knowledge (cache-first, {KNOWLEDGE_WORKERS} workers)...")
+
+    concept_knowledge_list, resolution_report = resolve_concept_knowledge_concurrent(
+        topic=topic,
+        concepts=valid_concepts,
+        semantic_context=merged_raw,
+        max_workers=KNOWLEDGE_WORKERS,
+        deadline_sec=KNOWLEDGE_DEADLINE_SEC
+    )
+    summarize_resolution(resolution_report)
+    flush_concept_knowledge(topic)
+
+    if not concept_knowledge_list:
+        print("[STOP] No concept knowledge resolved.")
+        return None, resolution_report
+
+    resolved = [
+        c for c, r in zip(valid_concepts, resolution_report)
+        if r["status"] in ("cached", "reused", "resolved")
+    ]
+    context_hash = content_hash(merged_raw)
+    for c, ck in zip(resolved, concept_knowledge_list):
+        manifest.complete_unit(
+            "knowledge", c.concept, ck.to_dict(),
+            knowledge_inputs_hash(c, context_hash)
+        )
+
+    # --------------------------------------------------
+    # 5. Generate atoms (several concepts per call, per-concept fallback)
+    # ORDER IS PRESERVED: atoms follow concept_knowledge_list order
+    # --------------------------------------------------
+    print("[5] Generating atoms (batched prompts)...")
+
+    atoms = []
+    order = 1
+
+    # reuse checkpointed bundles whose knowledge hasn't changed
+    bundles = [
+        manifest.unit("bundle", ck.concept, content_hash(ck.to_dict()))
+        for ck in concept_knowledge_list
+    ]
+    bundles = [[Atom.from_dict(a) for a in b] if b else None for b in bundles]
+    todo = [i for i, b in enumerate(bundles) if b is None]
+    if len(todo) < len(bundles):
+        print(f"[RESUME] {len(bundles) - len(todo)} atom bundles from checkpoint")
+
+    generated = generate_atom_bundles(topic, [concept_knowledge_list[i] for i in todo])
+    for i, bundle in zip(todo, generated):
+        bundles[i] = bundle
+        if bundle is not None:
+            ck = concept_knowledge_list[i]
+            manifest.complete_unit(
+                "bundle", ck.concept,
+                [a.to_dict() for a in bundle], content_hash(ck.to_dict())
+            )
+
+    for bundle in bundles:
+        for atom in bundle or []:
+            atom.order = order
+            order += 1
+            atoms.append(atom)
+
+    return atoms, resolution_report
+
+
+def _count_statuses(report):
+    counts = {}
+    for r in report:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build a scroll feed for a topic.")
+    parser.add_argument("topic", nargs="?", help="topic (prompted for if omitted)")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="reuse checkpoints from the last run of this topic"
+    )
+    parser.add_argument(
+        "--schema",
+        action="store_true",
+        help="constrain LLM output with JSON schemas and repair invalid fields"
+    )
+    return parser.parse_args(argv)
+
+
+def run_topic(topic, resume=False):
+    """
+    Run the whole pipeline for one topic without prompting.
+
+    Returns a status dict: {"topic", "status", "reason", "concepts",
+    "atoms", "resolution", "elapsed_sec"} with status "done" or
+    "stopped" (nothing to build). Errors propagate to the caller.
+    """
+    try:
+        return _run_topic(topic, resume)
+    finally:
+        release_concept_knowledge(topic)
+
+
+def _run_topic(topic, resume):
+    start = time.perf_counter()
+    status = {
+        "topic": topic,
+        "status": "stopped",
+        "reason": None,
+        "concepts": 0,
+        "atoms": 0,
+        "resolution": {},
+        "elapsed_sec": None
     }
 
+    def _finish(state, reason=None):
+        status["status"] = state
+        status["reason"] = reason
+        status["elapsed_sec"] = round(time.perf_counter() - start, 2)
+        return status
+
+    manifest = RunManifest(topic)
+    if resume:
+        print(f"[RESUME] Checkpoints: {manifest.summary()}")
+    else:
+        manifest.reset()
+
+    # --------------------------------------------------
+    # 1. Fetch sources
+    # --------------------------------------------------
+    sources = manifest.stage("sources")
+    if sources:
+        print("[1] Sources (checkpoint)")
+        wiki, textbook, refs = sources["wiki"], sources["textbook"], sources["refs"]
+    else:
+        print("[1] Fetching sources (parallel, cached)...")
+        wiki, textbook, refs = fetch_all_sources(topic)
+        manifest.complete_stage(
+            "sources",
+            {"wiki": wiki, "textbook": textbook, "refs": refs}
+        )
+
     save_raw(topic, wiki)
 
     # --------------------------------------------------
@@ -52,98 +202,113 @@ def main():
     # --------------------------------------------------
     # 3. Extract semantic concepts (LLM)
     # --------------------------------------------------
-    print("[3] Extracting semantic concepts...")
-    llm_output = extract_concepts_llm(topic, merged_raw)
-
-    # Loose / recovery-friendly concept structure
-    valid_concepts = [
-        {
-            "concept": c["name"],
-            "type": c["type"]
-        }
-        for c in llm_output.get("concepts", [])
-    ]
+    merged_hash = content_hash(merged_raw)
+    checkpoint = manifest.stage("concepts", merged_hash)
+
+    if checkpoint is not None:
+        print("[3] Semantic concepts (checkpoint)")
+        valid_concepts = [Concept.from_dict(c) for c in checkpoint]
+    else:
+        print("[3] Extracting semantic concepts...")
+        llm_output = extract_concepts_llm(topic, merged_raw)
+
+        # Loose / recovery-friendly concept structure
+        valid_concepts = []
+        for c in llm_output.get("concepts", []):
+            try:
+                valid_concepts.append(Concept(c["name"], c["type"]))
+            except ValueError:
+                continue
+        manifest.complete_stage(
+            "concepts", [c.to_dict() for c in valid_concepts], merged_hash
+        )
 
     if not valid_concepts:
         print("[STOP] No concepts extracted.")
-        return
+        return _finish("stopped", "no concepts extracted")
+
+    status["concepts"] = len(valid_concepts)
 
     save_semantic(topic, valid_concepts)
 
     print("[DONE] Concepts:")
     for c in valid_concepts:
-        print(f"- {c['concept']} ({c['type']})")
+        print(f"- {c.concept} ({c.type})")
+
+    if PIPELINE_STAGES:
+        # --------------------------------------------------
+        # 4+5. Resolve knowledge and generate atoms, overlapped
+        # ORDER IS PRESERVED: atoms follow valid_concepts order
+        # --------------------------------------------------
+        print(f"[4+5] Resolving knowledge → atoms (pipelined, {KNOWLEDGE_WORKERS} workers)...")
+
+        concept_knowledge_list, atoms, resolution_report = run_knowledge_atom_pipeline(
+            topic=topic,
+            concepts=valid_concepts,
+            semantic_context=merged_raw,
+            manifest=manifest
+        )
+        summarize_resolution(resolution_report)
+        flush_concept_knowledge(topic)
+        status["resolution"] = _count_statuses(resolution_report)
+
+        if not concept_knowledge_list:
+            print("[STOP] No concept knowledge resolved.")
+            return _finish("stopped", "no concept knowledge resolved")
+    else:
+        atoms, resolution_report = _resolve_then_generate(
+            topic, valid_concepts, merged_raw, manifest
+        )
+        status["resolution"] = _count_statuses(resolution_report)
+        if atoms is None:
+            return _finish("stopped", "no concept knowledge resolved")
+
+    save_atoms(topic, AtomFeed(topic, atoms))
 
-    # --------------------------------------------------
-    # 4. Resolve concept knowledge (CACHE → LLM)
-    # --------------------------------------------------
-    from process.knowledge_single_extractor import extract_single_concept_knowledge   
-    print("[4] Resolving concept knowledge (cache-first)...")
-
-    concept_knowledge_list = []
-
-    for c in valid_concepts:
-        cached = load_concept_knowledge(topic, c["concept"])
-        if cached:
-            concept_knowledge_list.append(cached)
-            continue
-
-        print(f"[LLM] Extracting knowledge → {c['concept']}")
-
-        try:
-            knowledge = extract_single_concept_knowledge(
-                topic=topic,
-                concept=c,                 # ✅ FULL DICT
-                semantic_context=merged_raw
-            )
+    print(f"[DONE] Generated {len(atoms)} atoms")
 
-            save_concept_knowledge(topic, knowledge)
-            concept_knowledge_list.append(knowledge)
+    from atoms.atom_curator import curate_atoms
 
-        except Exception as e:
-            print(f"[WARN] Failed for {c['concept']}: {e}")
+    raw_atom_feed = AtomFeed(topic, atoms)
 
-    if not concept_knowledge_list:
-        print("[STOP] No concept knowledge resolved.")
-        return
+    curated_atom_feed = curate_atoms(raw_atom_feed)
 
-    # --------------------------------------------------
-    # 5. Generate atoms (ONE CALL PER CONCEPT)
-    # ORDER IS PRESERVED: atoms follow concept_knowledge_list order
-    # --------------------------------------------------
-    print("[5] Generating atoms (1 call per concept)...")
+    save_atoms(topic, curated_atom_feed)
+    manifest.complete_stage(
+        "atoms",
+        {"count": len(curated_atom_feed.atoms)},
+        content_hash([a.to_dict() for a in atoms])
+    )
 
-    atoms = []
-    order = 1
+    status["atoms"] = len(curated_atom_feed.atoms)
+    return _finish("done")
 
-    for ck in concept_knowledge_list:
-        try:
-            bundle = generate_atom_bundle(topic, ck)
-            for atom in bundle:
-                atom["order"] = order
-                order += 1
-                atoms.append(atom)
-        except Exception as e:
-            print(f"[WARN] Atom generation failed for {ck['concept']}: {e}")
-
-    save_atoms(topic, {
-        "topic": topic,
-        "atoms": atoms
-    })
 
-    print(f"[DONE] Generated {len(atoms)} atoms")
+def print_cache_stats():
+    cache = get_client().cache
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"[CACHE] LLM responses: {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['entries']} entries"
+        )
 
-    from atoms.atom_curator import curate_atoms
+    repairs = repair_stats()
+    if repairs:
+        print("[JSON] " + ", ".join(f"{k}: {v}" for k, v in sorted(repairs.items())))
 
-    raw_atom_feed = {
-        "topic": topic,
-        "atoms": atoms
-    }
 
-    curated_atom_feed = curate_atoms(raw_atom_feed)
+def main(argv=None):
+    args = parse_args(argv)
+    topic = (args.topic or input("Enter topic: ")).strip()
+    if not topic:
+        return
 
-    save_atoms(topic, curated_atom_feed)
+    if args.schema:
+        structured_output.USE_SCHEMAS = True
 
+    run_topic(topic, resume=args.resume)
+    print_cache_stats()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
-from process.text_utils import normalize_text, safe_split_lines, parse_json_garbage
-from process.llm_extractor import run_llm_text
+from process.text_utils import (
+    normalize_text,
+    safe_split_lines,
+    parse_json_garbage,
+    approx_token_count
+)
+from process import llm_client, structured_output
+from process.models import Atom, ConceptKnowledge
 
 PROMPT = """
 You are generating learning atoms for scrolling study.
@@ -43,39 +49,214 @@ Output format:
 
 
 def generate_atom_bundle(topic, concept_knowledge):
+    concept_knowledge = ConceptKnowledge.coerce(concept_knowledge)
     prompt = PROMPT.format(
         topic=topic,
-        concept=concept_knowledge["concept"],
-        concept_type=concept_knowledge["type"],
-        knowledge=_format_knowledge(concept_knowledge["knowledge"])
+        concept=concept_knowledge.concept,
+        concept_type=concept_knowledge.type,
+        knowledge=_format_knowledge(concept_knowledge.knowledge)
     )
 
 
-    text = normalize_text(run_llm_text(prompt))
+    if structured_output.USE_SCHEMAS:
+        atoms = structured_output.generate_validated(
+            prompt,
+            structured_output.atom_list_schema(),
+            label=f"atoms for {concept_knowledge.concept}"
+        )
+        return _bundle_from_items(topic, concept_knowledge, atoms)
+
+    text = normalize_text(llm_client.generate(prompt, stop_at_json=True))
     lines = safe_split_lines(text)
 
 
     try:
         atoms = parse_json_garbage(text)
+        return _bundle_from_items(topic, concept_knowledge, atoms)
     except Exception as e:
-        print(f"[ERROR] Failed to parse JSON for {concept_knowledge['concept']}: {e}")
+        print(f"[ERROR] Failed to parse JSON for {concept_knowledge.concept}: {e}")
         print(f"[DEBUG] Original text: {text[:500]}...")
+        llm_client.invalidate(prompt, stop_at_json=True)
         raise e
 
+
+def _bundle_from_items(topic, concept_knowledge, atoms):
     results = []
     for a in atoms:
         content = a["content"]
         if isinstance(content, list):
             content = "\n".join(content)
         
-        results.append({
-            "topic": topic,
-            "concept": concept_knowledge["concept"],
-            "atom_type": a["atom_type"],
-            "content": content,
-            "difficulty": "easy",
-            "estimated_read_time_sec": max(4, min(10, len(content.split()) // 4))
-        })
+        results.append(Atom(
+            topic,
+            concept_knowledge.concept,
+            a["atom_type"],
+            content,
+            "easy",
+            max(4, min(10, len(content.split()) // 4))
+        ))
+
+    return results
+
+
+# ---------------------------------------------------------
+# Batched generation (several concepts per prompt)
+# ---------------------------------------------------------
+
+BATCH_PROMPT = """
+You are generating learning atoms for scrolling study.
+
+Topic: {topic}
+
+For EACH concept below, generate 6–10 learning atoms.
+
+Allowed atom types:
+- explanation
+- mental_model (IMPORTANT: Use UNIQUE, creative analogies. Avoid: chain, links, boxes, train, arrows)
+- example
+- key_points
+- pitfall
+- why_it_matters
+- quick_check
+
+Rules:
+- Simple language
+- Short paragraphs
+- Beginner friendly
+- No repetition
+- No emojis
+- No headings
+- Return ONLY valid JSON
+
+{concepts}
+
+Output format (one key per concept, exactly as named above):
+{{
+  "<concept name>": [
+    {{
+      "atom_type": "...",
+      "content": "..."
+    }}
+  ]
+}}
+"""
+
+CONCEPT_BLOCK = """### Concept: {concept}
+Concept Type: {concept_type}
+Authoritative knowledge:
+{knowledge}
+"""
+
+# Knowledge tokens packed into one prompt, and a hard cap on concepts
+BATCH_TOKEN_BUDGET = 1200
+MAX_BATCH_CONCEPTS = 4
+
+
+def knowledge_tokens(concept_knowledge):
+    """
+    Approximate prompt tokens of one concept's knowledge (what the batch
+    budget is measured in).
+    """
+    return approx_token_count(_format_knowledge(concept_knowledge.knowledge))
+
+
+def _plan_batches(concept_knowledge_list, token_budget, max_concepts):
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for i, ck in enumerate(concept_knowledge_list):
+        tokens = knowledge_tokens(ck)
+        if current and (
+            current_tokens + tokens > token_budget or len(current) >= max_concepts
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _generate_batch(topic, cks):
+    prompt = BATCH_PROMPT.format(
+        topic=topic,
+        concepts="\n".join(
+            CONCEPT_BLOCK.format(
+                concept=ck.concept,
+                concept_type=ck.type,
+                knowledge=_format_knowledge(ck.knowledge)
+            )
+            for ck in cks
+        )
+    )
+
+    if structured_output.USE_SCHEMAS:
+        parsed = structured_output.generate_validated(
+            prompt,
+            structured_output.atom_batch_schema([ck.concept for ck in cks]),
+            label=f"atoms for {len(cks)} concepts"
+        )
+    else:
+        text = normalize_text(llm_client.generate(prompt, stop_at_json=True))
+        try:
+            parsed = parse_json_garbage(text)
+            if not isinstance(parsed, dict):
+                raise ValueError("batched response is not a JSON object")
+        except ValueError:
+            llm_client.invalidate(prompt, stop_at_json=True)
+            raise
+
+    by_name = {str(k).strip().lower(): v for k, v in parsed.items()}
+    bundles = {}
+    for ck in cks:
+        items = by_name.get(ck.concept.strip().lower())
+        if isinstance(items, list) and items:
+            try:
+                bundles[ck.concept] = _bundle_from_items(topic, ck, items)
+            except (KeyError, TypeError, ValueError):
+                pass
+    return bundles
+
+
+def generate_atom_bundles(
+    topic,
+    concept_knowledge_list,
+    token_budget=BATCH_TOKEN_BUDGET,
+    max_concepts=MAX_BATCH_CONCEPTS
+):
+    """
+    Generate bundles for many concepts, packing several concepts into one
+    prompt under a knowledge-token budget. Concepts missing from (or
+    unparseable in) a batched reply fall back to generate_atom_bundle.
+
+    Returns a list aligned with concept_knowledge_list; an entry is None
+    when even the per-concept fallback failed.
+    """
+    concept_knowledge_list = [ConceptKnowledge.coerce(ck) for ck in concept_knowledge_list]
+    results = [None] * len(concept_knowledge_list)
+
+    for batch in _plan_batches(concept_knowledge_list, token_budget, max_concepts):
+        cks = [concept_knowledge_list[i] for i in batch]
+        bundles = {}
+
+        if len(cks) > 1:
+            try:
+                bundles = _generate_batch(topic, cks)
+            except Exception as e:
+                print(f"[WARN] Batched atom generation failed ({len(cks)} concepts): {e}")
+
+        for i, ck in zip(batch, cks):
+            bundle = bundles.get(ck.concept)
+            if bundle is None:
+                try:
+                    bundle = generate_atom_bundle(topic, ck)
+                except Exception as e:
+                    print(f"[WARN] Atom generation failed for {ck.concept}: {e}")
+            results[i] = bundle
 
     return results
 
@@ -1,16 +1,33 @@
 """
 Utility for normalizing concept names using NLP stemming to prevent duplicates.
 """
-from nltk.stem import PorterStemmer
-import nltk
+import threading
+from functools import lru_cache
 
-# Download required NLTK data (only runs once)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+# NLTK is imported on first use so importing this module stays cheap.
+_stemmer = None
+_stemmer_lock = threading.Lock()
 
-_stemmer = PorterStemmer()
+
+def _get_stemmer():
+    global _stemmer
+    with _stemmer_lock:
+        if _stemmer is None:
+            import nltk
+            from nltk.stem import PorterStemmer
+
+            # Download required NLTK data (only runs once)
+            try:
+                nltk.data.find('tokenizers/punkt')
+            except LookupError:
+                nltk.download('punkt', quiet=True)
+
+            _stemmer = PorterStemmer()
+        return _stemmer
+
+
+def warm_up():
+    _get_stemmer()
 
 
 def normalize_concept_name(concept: str) -> str:
@@ -29,9 +46,13 @@ def normalize_concept_name(concept: str) -> str:
     Returns:
         Stemmed version of the concept name
     """
-    words = concept.lower().split()
-    stemmed = " ".join(_stemmer.stem(word) for word in words)
-    return stemmed
+    return _normalize_cached(concept.lower())
+
+
+@lru_cache(maxsize=8192)
+def _normalize_cached(lowered: str) -> str:
+    stemmer = _get_stemmer()
+    return " ".join(stemmer.stem(word) for word in lowered.split())
 
 
 def are_concepts_duplicate(concept1: str, concept2: str) -> bool:
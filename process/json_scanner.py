@@ -0,0 +1,392 @@
+"""
+Single-pass, tolerant JSON scanner for LLM output.
+
+scan_json() finds the first top-level object/array in a response and
+parses it directly into Python values. Well-formed JSON takes the C fast
+path (json raw_decode from the first bracket); anything else goes through
+one recursive-descent pass that repairs the defects local models
+produce and records which repairs it applied:
+
+    code_fence        ```json ... ``` around the value
+    leading_text      prose before the value
+    trailing_comma    ",}" or ",]"
+    missing_comma     two members/items with no comma between them
+    single_quotes     'strings' or 'keys'
+    unquoted_keys     {name: ...}
+    python_literals   True / False / None
+    bad_escape        backslash before a char JSON cannot escape
+    control_chars     raw newlines/tabs inside strings
+    unescaped_quote   a bare " inside a string
+    truncated         input ended before the value was closed
+
+A truncated value is rejected (JSONScanError, counted as failed) unless
+the caller passes allow_truncated=True: closing it would invent the
+half-written last field. is_complete_json() is the side-effect-free
+check used while streaming.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+# Raw outputs that needed repairs (or failed) are written here when
+# DUMP_SAMPLES is on; benchmark_json.py uses the folder as its corpus.
+DUMP_SAMPLES = False
+SAMPLE_DIR = os.path.join("output", "llm_failures")
+
+MAX_START_ATTEMPTS = 8
+
+_decoder = json.JSONDecoder()
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_BARE_WORD = re.compile(r"[A-Za-z_$][\w$-]*")
+_NEXT_KEY = re.compile(r"[\"'][^\"'\n]*[\"']\s*:")
+_CHUNK = {
+    '"': re.compile(r'[^"\\\x00-\x1f]*'),
+    "'": re.compile(r"[^'\\\x00-\x1f]*"),
+}
+_ESCAPES = {
+    '"': '"', "\\": "\\", "/": "/", "b": "\b",
+    "f": "\f", "n": "\n", "r": "\r", "t": "\t", "'": "'"
+}
+_LITERALS = {
+    "true": (True, None), "false": (False, None), "null": (None, None),
+    "True": (True, "python_literals"), "False": (False, "python_literals"),
+    "None": (None, "python_literals"),
+}
+_VALUE_START = set('{["\'-0123456789') | set("tfnTFN")
+
+
+_repair_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+class JSONScanError(ValueError):
+    pass
+
+
+class _Scanner:
+    def __init__(self, text, pos):
+        self.text = text
+        self.pos = pos
+        self.end = len(text)
+        self.repairs = []
+
+    def note(self, repair):
+        if repair not in self.repairs:
+            self.repairs.append(repair)
+
+    def skip_ws(self):
+        self.pos = _WS.match(self.text, self.pos).end()
+        # stray fences inside the value (e.g. a closing ``` before "]")
+        if self.text.startswith("```", self.pos):
+            self.note("code_fence")
+            self.pos += 3
+            self.skip_ws()
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < self.end else ""
+
+    # ---------------------------------------------------------
+    # Values
+    # ---------------------------------------------------------
+
+    def value(self):
+        self.skip_ws()
+        ch = self.peek()
+        if ch == "{":
+            return self.obj()
+        if ch == "[":
+            return self.arr()
+        if ch in "\"'":
+            return self.string(ch)
+        m = _NUMBER.match(self.text, self.pos)
+        if m:
+            self.pos = m.end()
+            s = m.group()
+            return float(s) if "." in s or "e" in s or "E" in s else int(s)
+        m = _BARE_WORD.match(self.text, self.pos)
+        if m and m.group() in _LITERALS:
+            self.pos = m.end()
+            value, repair = _LITERALS[m.group()]
+            if repair:
+                self.note(repair)
+            return value
+        if not ch:
+            raise JSONScanError("unexpected end of input")
+        raise JSONScanError(f"unexpected {ch!r} at {self.pos}")
+
+    def string(self, quote):
+        if quote == "'":
+            self.note("single_quotes")
+        text = self.text
+        chunk = _CHUNK[quote]
+        self.pos += 1
+        parts = []
+
+        while True:
+            m = chunk.match(text, self.pos)
+            parts.append(m.group())
+            self.pos = m.end()
+            if self.pos >= self.end:
+                self.note("truncated")
+                return "".join(parts)
+
+            ch = text[self.pos]
+            if ch == quote:
+                if not self._closes_string(self.pos + 1):
+                    self.note("unescaped_quote")
+                    parts.append(quote)
+                    self.pos += 1
+                    continue
+                self.pos += 1
+                return "".join(parts)
+
+            if ch == "\\":
+                nxt = text[self.pos + 1:self.pos + 2]
+                if nxt in _ESCAPES:
+                    if nxt == "'" and quote == '"':
+                        self.note("bad_escape")
+                    parts.append(_ESCAPES[nxt])
+                    self.pos += 2
+                elif nxt == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[self.pos + 2:self.pos + 6]):
+                    parts.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                else:
+                    # keep the backslash as a literal character
+                    self.note("bad_escape")
+                    parts.append("\\")
+                    self.pos += 1
+                continue
+
+            # raw control character
+            self.note("control_chars")
+            parts.append(ch)
+            self.pos += 1
+
+    def _closes_string(self, pos):
+        """
+        A quote ends the string if what follows looks like JSON structure:
+        a separator, a closing bracket, the next key, or a line break
+        (missing comma). Otherwise it is part of the text ("it's").
+        """
+        after = _WS.match(self.text, pos).end()
+        if after >= self.end:
+            return True
+        if self.text[after] in ",:}]" or self.text.startswith("```", after):
+            return True
+        if _NEXT_KEY.match(self.text, after):
+            return True
+        return "\n" in self.text[pos:after]
+
+    def key(self):
+        ch = self.peek()
+        if ch in "\"'":
+            return self.string(ch)
+        m = _BARE_WORD.match(self.text, self.pos)
+        if m:
+            self.note("unquoted_keys")
+            self.pos = m.end()
+            return m.group()
+        raise JSONScanError(f"expected key at {self.pos}")
+
+    def obj(self):
+        self.pos += 1
+        result = {}
+        while True:
+            self.skip_ws()
+            ch = self.peek()
+            if not ch:
+                self.note("truncated")
+                return result
+            if ch == "}":
+                self.pos += 1
+                return result
+
+            k = self.key()
+            self.skip_ws()
+            if self.peek() == ":":
+                self.pos += 1
+            elif not self.peek():
+                self.note("truncated")
+                return result
+            else:
+                raise JSONScanError(f"expected ':' at {self.pos}")
+
+            self.skip_ws()
+            if not self.peek():
+                self.note("truncated")
+                return result
+            result[k] = self.value()
+
+            if self._separator("}"):
+                self.pos += 1
+                return result
+
+    def arr(self):
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_ws()
+            ch = self.peek()
+            if not ch:
+                self.note("truncated")
+                return result
+            if ch == "]":
+                self.pos += 1
+                return result
+
+            result.append(self.value())
+
+            if self._separator("]"):
+                self.pos += 1
+                return result
+
+    def _separator(self, close):
+        """
+        Consume what sits between two members. Returns True when the
+        container's closing bracket is next.
+        """
+        self.skip_ws()
+        ch = self.peek()
+        if ch == ",":
+            self.pos += 1
+            self.skip_ws()
+            if self.peek() == close:
+                self.note("trailing_comma")
+                return True
+            return False
+        if ch == close:
+            return True
+        if not ch:
+            return False
+        if ch in _VALUE_START or (close == "}" and _BARE_WORD.match(self.text, self.pos)):
+            self.note("missing_comma")
+            return False
+        raise JSONScanError(f"unexpected {ch!r} at {self.pos}")
+
+
+def _value_starts(text, expect):
+    openers = re.compile("[" + re.escape(expect or "{[") + "]")
+    for m in openers.finditer(text):
+        yield m.start()
+
+
+def scan_json(text: str, expect=None, max_attempts=MAX_START_ATTEMPTS, allow_truncated=False):
+    """
+    Parse the first top-level JSON value in `text`.
+
+    expect="{" or "[" restricts which kind of value is looked for. If
+    the value at the first bracket cannot be read (e.g. "[1]" in leading
+    prose), scanning moves on to the next bracket, up to max_attempts.
+
+    Returns (value, repairs) where repairs lists the applied fixes in the
+    order they were first needed (empty for clean JSON). Raises
+    JSONScanError (a ValueError) when nothing usable is found, or when
+    the value is truncated and allow_truncated is False.
+    """
+    error = JSONScanError("No JSON found in LLM response")
+
+    for attempt, start in enumerate(_value_starts(text, expect)):
+        if attempt >= max_attempts:
+            break
+
+        prefix = []
+        if "```" in text[:start]:
+            prefix.append("code_fence")
+        if text[:start].replace("```json", "").replace("```", "").strip():
+            prefix.append("leading_text")
+
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+            _count(prefix)
+            return value, prefix
+        except ValueError:
+            pass
+
+        scanner = _Scanner(text, start)
+        scanner.repairs.extend(prefix)
+        try:
+            value = scanner.value()
+        except JSONScanError as e:
+            error = e
+            continue
+
+        if "truncated" in scanner.repairs and not allow_truncated:
+            _count(["failed", "truncated"])
+            _dump_sample(text, ["failed"] + scanner.repairs)
+            raise JSONScanError("JSON value is truncated")
+
+        _count(scanner.repairs)
+        _dump_sample(text, scanner.repairs)
+        return value, scanner.repairs
+
+    _count(["failed"])
+    _dump_sample(text, ["failed"])
+    raise error
+
+
+def loads_tolerant(text: str, expect=None):
+    """
+    scan_json() without the repair report. Truncated values raise.
+    """
+    return scan_json(text, expect)[0]
+
+
+def is_complete_json(candidate: str) -> bool:
+    """
+    True when `candidate` (starting at its opening bracket) reads as one
+    complete value, repairs allowed. Unlike scan_json() it leaves
+    repair_stats() and the sample folder alone, so streaming checks
+    don't count each response twice.
+    """
+    try:
+        _decoder.raw_decode(candidate, 0)
+        return True
+    except ValueError:
+        pass
+    scanner = _Scanner(candidate, 0)
+    try:
+        scanner.value()
+    except JSONScanError:
+        return False
+    return "truncated" not in scanner.repairs
+
+
+def _count(repairs):
+    with _counts_lock:
+        _repair_counts["parsed" if "failed" not in repairs else "failed"] += 1
+        for r in repairs:
+            if r != "failed":
+                _repair_counts[r] += 1
+
+
+def repair_stats() -> dict:
+    """
+    How often each repair was needed since startup (plus parsed/failed).
+    """
+    with _counts_lock:
+        return dict(_repair_counts)
+
+
+def _dump_sample(text, repairs):
+    if not DUMP_SAMPLES:
+        return
+    try:
+        os.makedirs(SAMPLE_DIR, exist_ok=True)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(SAMPLE_DIR, f"{digest}.json")
+        if os.path.exists(path):
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "captured_at": time.time(),
+                "repairs": repairs,
+                "text": text
+            }, f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
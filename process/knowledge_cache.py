@@ -1,25 +1,186 @@
-import json
-import os
+import threading
 
-CACHE_DIR = "output/concept_cache"
-os.makedirs(CACHE_DIR, exist_ok=True)
+from process.concept_normalizer import normalize_concept_name
+from storage.knowledge_base import get_knowledge_base, topic_key
 
+# Global (cross-topic) knowledge lookups live in the shared knowledge
+# base; concepts are matched on their stemmed name plus concept type.
+GLOBAL_TOPIC = "_global"
 
-def _path(concept_name: str):
-    safe = concept_name.lower().replace(" ", "_")
-    return os.path.join(CACHE_DIR, f"{safe}.json")
+# Stemmed-token Jaccard needed to reuse a differently-named concept
+REUSE_SIMILARITY = 0.75
+
+# Topics that must always resolve their own knowledge via the LLM
+REUSE_DISABLED_TOPICS = set()
+
+# Operation / complexity concepts and one-word names ("Insertion",
+# "Time Complexity", "Node") mean different things under different
+# topics, so they are only reused from a related topic: stemmed topic
+# tokens (minus filler words) must overlap by at least TOPIC_SIMILARITY.
+TOPIC_SCOPED_TYPES = {"Operation", "Complexity"}
+TOPIC_SIMILARITY = 0.5
+TOPIC_FILLER_WORDS = [
+    "a", "an", "the", "in", "of", "on", "and", "for", "to",
+    "data", "structure", "structures", "algorithm", "algorithms",
+    "introduction", "basics", "concept", "concepts"
+]
 
 
 def load_concept_from_cache(concept_name: str):
-    path = _path(concept_name)
-    if not os.path.exists(path):
+    matches = get_knowledge_base().knowledge_for_concept(concept_name)
+    return matches[0] if matches else None
+
+
+def save_concept_to_cache(concept_knowledge: dict):
+    topic = concept_knowledge.get("topic") or GLOBAL_TOPIC
+    get_knowledge_base().upsert_knowledge(topic, [concept_knowledge])
+    _index.add(topic, concept_knowledge)
+
+
+# ---------------------------------------------------------
+# Global concept index (stemmed name + type → topics)
+# ---------------------------------------------------------
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _GlobalConceptIndex:
+    """
+    In-memory index over every knowledge row in the knowledge base.
+    Built lazily on first lookup; kept current by note_saved().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        # (normalized_name, type) -> [(topic, concept)]
+        self._exact = {}
+        # (stem token, type) -> {normalized_name}
+        self._tokens = {}
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        for topic, concept, normalized, ctype in get_knowledge_base().knowledge_names():
+            self._insert(topic, concept, normalized, ctype)
+        self._loaded = True
+
+    def _insert(self, topic, concept, normalized, ctype):
+        entries = self._exact.setdefault((normalized, ctype), [])
+        if (topic, concept) not in entries:
+            entries.append((topic, concept))
+        for token in normalized.split():
+            self._tokens.setdefault((token, ctype), set()).add(normalized)
+
+    def add(self, topic, concept_knowledge):
+        with self._lock:
+            if not self._loaded:
+                return
+            name = concept_knowledge["concept"]
+            self._insert(
+                topic,
+                name,
+                normalize_concept_name(name),
+                concept_knowledge.get("type")
+            )
+
+    def candidates(self, concept, concept_type, exclude_topic=None, min_similarity=REUSE_SIMILARITY):
+        """
+        [(similarity, topic, stored_concept)] best first; exact stemmed
+        matches score 1.0.
+        """
+        normalized = normalize_concept_name(concept)
+        tokens = set(normalized.split())
+        excluded = topic_key(exclude_topic) if exclude_topic else None
+
+        with self._lock:
+            self._ensure_loaded()
+
+            names = {normalized}
+            for token in tokens:
+                names |= self._tokens.get((token, concept_type), set())
+
+            found = []
+            for name in names:
+                sim = 1.0 if name == normalized else _jaccard(tokens, set(name.split()))
+                if sim < min_similarity:
+                    continue
+                for topic, stored in self._exact.get((name, concept_type), ()):
+                    if excluded and topic_key(topic) == excluded:
+                        continue
+                    found.append((sim, topic, stored))
+
+        found.sort(key=lambda x: (-x[0], x[1], x[2]))
+        return found
+
+
+_index = _GlobalConceptIndex()
+
+
+def _topic_tokens(topic: str) -> set:
+    filler = set(normalize_concept_name(" ".join(TOPIC_FILLER_WORDS)).split())
+    return set(normalize_concept_name(topic.replace("_", " ")).split()) - filler
+
+
+def topic_similarity(topic_a: str, topic_b: str) -> float:
+    return _jaccard(_topic_tokens(topic_a), _topic_tokens(topic_b))
+
+
+def _topic_scoped(concept: str, concept_type: str) -> bool:
+    return concept_type in TOPIC_SCOPED_TYPES or len(concept.split()) < 2
+
+
+def note_saved(topic: str, concept_knowledge: dict):
+    """
+    Tell the global index about knowledge just stored for a topic.
+    """
+    _index.add(topic, concept_knowledge)
+
+
+def find_reusable_knowledge(
+    topic: str,
+    concept: str,
+    concept_type: str,
+    min_similarity=REUSE_SIMILARITY
+):
+    """
+    Look for knowledge resolved under another topic for the same concept
+    (stemmed name + type, or a close stemmed-token match).
+
+    Generic concepts (_topic_scoped) are only taken from topics whose
+    topic_similarity to `topic` is at least TOPIC_SIMILARITY.
+
+    Returns a copy renamed to `concept` with a "provenance" entry, or None.
+    """
+    if topic in REUSE_DISABLED_TOPICS:
         return None
 
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    scoped = _topic_scoped(concept, concept_type)
 
+    for sim, source_topic, stored in _index.candidates(
+        concept, concept_type, exclude_topic=topic, min_similarity=min_similarity
+    ):
+        if scoped and topic_similarity(topic, source_topic) < TOPIC_SIMILARITY:
+            continue
 
-def save_concept_to_cache(concept_knowledge: dict):
-    path = _path(concept_knowledge["concept"])
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(concept_knowledge, f, indent=2)
+        matches = get_knowledge_base().knowledge_for_concept(
+            stored, concept_type, topic=source_topic
+        )
+        if not matches:
+            continue
+
+        reused = dict(matches[0])
+        reused.pop("topic", None)
+        reused["concept"] = concept
+        reused["type"] = concept_type
+        reused["provenance"] = {
+            "reused_from_topic": source_topic,
+            "source_concept": stored,
+            "similarity": round(sim, 3)
+        }
+        return reused
+
+    return None
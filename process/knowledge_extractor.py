@@ -1,10 +1,9 @@
-import json
-import requests
+from process import llm_client, structured_output
+from process.json_scanner import JSONScanError, loads_tolerant
+from process.knowledge_contracts import KNOWLEDGE_CONTRACTS
 
 MAX_CONTEXT_CHARS = 1200
-
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL = "mistral"
+KNOWLEDGE_TIMEOUT = 120
 
 
 # ---------------------------------------------------------
@@ -38,18 +37,6 @@ def _focus_context(concept: str, semantic_context: dict) -> str:
     return text[start:end]
 
 
-# ---------------------------------------------------------
-# Helper: safely extract JSON from LLM output
-# ---------------------------------------------------------
-
-def _extract_json_safely(text: str):
-    start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("No valid JSON found in LLM output")
-    return json.loads(text[start:end + 1])
-
-
 # ---------------------------------------------------------
 # Single concept extractor (SAFE)
 # ---------------------------------------------------------
@@ -93,19 +80,28 @@ Rules:
 """
 
     try:
-        response = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": MODEL,
-                "prompt": prompt,
-                "stream": False
-            },
-            timeout=120
+        if structured_output.USE_SCHEMAS:
+            contract = KNOWLEDGE_CONTRACTS.get(concept_type, [])
+            if contract:
+                prompt += "\nAlso include these knowledge fields: " + ", ".join(contract) + "\n"
+            return structured_output.generate_validated(
+                prompt,
+                structured_output.knowledge_schema(concept, concept_type),
+                timeout=KNOWLEDGE_TIMEOUT,
+                label=f"knowledge for {concept}"
+            )
+
+        raw_text = llm_client.generate(
+            prompt,
+            timeout=KNOWLEDGE_TIMEOUT,
+            stop_at_json="{"
         )
-        response.raise_for_status()
-
-        raw_text = response.json().get("response", "")
-        return _extract_json_safely(raw_text)
+        try:
+            return loads_tolerant(raw_text, expect="{")
+        except JSONScanError:
+            # don't replay an unparseable reply on the next run
+            llm_client.invalidate(prompt, stop_at_json="{")
+            raise
 
     except Exception as e:
         print(f"[SKIP] Knowledge extraction failed for {concept}: {e}")
@@ -1,8 +1,23 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from process.knowledge_cache import (
     load_concept_from_cache,
-    save_concept_to_cache
+    save_concept_to_cache,
+    find_reusable_knowledge,
+    note_saved
 )
 from process.knowledge_extractor import extract_concept_knowledge
+from process.knowledge_single_extractor import extract_single_concept_knowledge
+from process.models import Concept, ConceptKnowledge
+from storage.concept_knowledge_store import (
+    load_concept_knowledge,
+    save_concept_knowledge
+)
+
+# Concurrent resolution defaults (main.py step 4)
+KNOWLEDGE_WORKERS = 4
+KNOWLEDGE_DEADLINE_SEC = 900
 
 
 def resolve_concept_knowledge(topic, concepts, semantic_context):
@@ -41,3 +56,192 @@ def resolve_concept_knowledge(topic, concepts, semantic_context):
             print(f"[WARN] Failed for {name}: {e}")
 
     return resolved
+
+
+# ---------------------------------------------------------
+# Concurrent resolver (per-topic store, bounded workers)
+# ---------------------------------------------------------
+
+def _extract_timed(topic, concept, semantic_context):
+    start = time.perf_counter()
+    knowledge = extract_single_concept_knowledge(
+        topic=topic,
+        concept=concept,
+        semantic_context=semantic_context
+    )
+    if not knowledge:
+        raise ValueError("empty knowledge returned")
+
+    # the model usually echoes concept/type; fill them in if it didn't
+    knowledge = dict(knowledge)
+    knowledge.setdefault("concept", concept.concept)
+    knowledge.setdefault("type", concept.type)
+    return ConceptKnowledge.from_dict(knowledge), time.perf_counter() - start
+
+
+def _from_store(knowledge):
+    try:
+        return ConceptKnowledge.from_dict(knowledge)
+    except ValueError:
+        return None
+
+
+def resolve_concept_knowledge_concurrent(
+    topic,
+    concepts,
+    semantic_context,
+    max_workers=KNOWLEDGE_WORKERS,
+    deadline_sec=KNOWLEDGE_DEADLINE_SEC,
+    reuse_across_topics=True,
+    on_resolved=None
+):
+    """
+    Cache-first resolver that runs LLM extractions on a bounded pool.
+
+    Lookup order: per-topic store (always wins, so it doubles as the
+    per-topic override), then knowledge resolved under other topics
+    (same stemmed name + type), then the LLM.
+
+    `concepts` are Concept records (dicts are accepted). Results are
+    ConceptKnowledge records in the order of `concepts`, so atom ordering
+    matches a sequential run. Saves happen on the calling thread only.
+
+    Returns (resolved, report) where report holds one entry per concept:
+    {"concept", "status", "elapsed_sec", "error"} with status one of
+    cached / reused / resolved / failed / timeout.
+
+    If given, on_resolved(index, knowledge) is called on the calling
+    thread as soon as each concept has knowledge, so later stages can
+    start before the whole list is done.
+    """
+
+    def _emit(i):
+        if on_resolved is not None:
+            on_resolved(i, results[i])
+
+    concepts = [Concept.coerce(c) for c in concepts]
+    results = [None] * len(concepts)
+    report = [None] * len(concepts)
+    pending_idx = []
+
+    # 1️⃣ Cache-first (sequential, cheap)
+    for i, c in enumerate(concepts):
+        cached = load_concept_knowledge(topic, c.concept)
+        cached = _from_store(cached) if cached else None
+        if cached:
+            results[i] = cached
+            report[i] = {
+                "concept": c.concept,
+                "status": "cached",
+                "elapsed_sec": 0.0,
+                "error": None
+            }
+            _emit(i)
+            continue
+
+        reused = None
+        if reuse_across_topics:
+            reused = find_reusable_knowledge(topic, c.concept, c.type)
+            reused = _from_store(reused) if reused else None
+
+        if reused:
+            save_concept_knowledge(topic, reused.to_dict())
+            note_saved(topic, reused.to_dict())
+            results[i] = reused
+            report[i] = {
+                "concept": c.concept,
+                "status": "reused",
+                "elapsed_sec": 0.0,
+                "error": None
+            }
+            print(f"[REUSE] {c.concept} ← {reused.provenance['reused_from_topic']}")
+            _emit(i)
+        else:
+            pending_idx.append(i)
+
+    if not pending_idx:
+        return [r for r in results if r], report
+
+    # 2️⃣ LLM fallback on a bounded pool
+    deadline = time.monotonic() + deadline_sec
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = {}
+
+    try:
+        for i in pending_idx:
+            c = concepts[i]
+            print(f"[LLM] Extracting knowledge → {c.concept}")
+            future = executor.submit(_extract_timed, topic, c, semantic_context)
+            futures[future] = i
+
+        not_done = set(futures)
+        while not_done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            done, not_done = wait(
+                not_done,
+                timeout=remaining,
+                return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                i = futures[future]
+                name = concepts[i].concept
+                try:
+                    knowledge, elapsed = future.result()
+
+                    stored = knowledge.to_dict()
+                    save_concept_knowledge(topic, stored)
+                    note_saved(topic, stored)
+                    results[i] = knowledge
+                    report[i] = {
+                        "concept": name,
+                        "status": "resolved",
+                        "elapsed_sec": round(elapsed, 2),
+                        "error": None
+                    }
+                    print(f"[TIME] {name} → {elapsed:.1f}s")
+                    _emit(i)
+
+                except Exception as e:
+                    report[i] = {
+                        "concept": name,
+                        "status": "failed",
+                        "elapsed_sec": None,
+                        "error": str(e)
+                    }
+                    print(f"[WARN] Failed for {name}: {e}")
+
+        for future in not_done:
+            future.cancel()
+            i = futures[future]
+            report[i] = {
+                "concept": concepts[i].concept,
+                "status": "timeout",
+                "elapsed_sec": None,
+                "error": f"deadline of {deadline_sec}s exceeded"
+            }
+            print(f"[WARN] Deadline exceeded for {concepts[i].concept}")
+
+    finally:
+        # Don't block on stragglers past the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return [r for r in results if r], report
+
+
+def summarize_resolution(report):
+    """
+    Print a short per-topic summary of a concurrent resolution report.
+    """
+    counts = {}
+    for r in report:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+
+    print("[REPORT] " + ", ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
+
+    for r in report:
+        if r["status"] in ("failed", "timeout"):
+            print(f"  - {r['concept']}: {r['status']} ({r['error']})")
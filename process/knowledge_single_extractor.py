@@ -1,24 +1,22 @@
 from process.knowledge_extractor import extract_concept_knowledge
+from process.models import Concept
 
 
 def extract_single_concept_knowledge(
     topic: str,
-    concept: dict,
+    concept,
     semantic_context
 ):
     """
     Safe single-concept wrapper.
-    Accepts semantic_context as dict or str and normalizes it.
+    Accepts concept as Concept or dict, semantic_context as dict or str.
     """
 
-    if not isinstance(concept, dict):
-        raise TypeError(f"concept must be dict, got {type(concept)}")
+    if not isinstance(concept, (Concept, dict)):
+        raise TypeError(f"concept must be Concept or dict, got {type(concept)}")
 
-    concept_name = concept.get("concept")
-    concept_type = concept.get("type")
-
-    if not concept_name or not concept_type:
-        raise ValueError(f"Invalid concept structure: {concept}")
+    # Concept validates name and type once, on construction
+    concept = Concept.coerce(concept)
 
     # normalize semantic_context
     if isinstance(semantic_context, str):
@@ -32,8 +30,8 @@ def extract_single_concept_knowledge(
 
     return extract_concept_knowledge(
         topic=topic,
-        concept=concept_name,
-        concept_type=concept_type,
+        concept=concept.concept,
+        concept_type=concept.type,
         semantic_context=semantic_context
     )
 
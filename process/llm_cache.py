@@ -0,0 +1,233 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Entries are keyed by sha256(model, prompt, generation options) and live
+in a single SQLite file. Old entries expire after TTL_SEC; when the cache
+grows past MAX_ENTRIES or MAX_BYTES the least recently used rows go first.
+Entry count and total size are kept as running totals, so a put() never
+scans the table unless something has to be evicted; the expiry sweep
+runs at most once per EXPIRE_INTERVAL_SEC (get() drops stale rows it
+meets in between).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.path.join("output", "llm_cache.sqlite3")
+MAX_ENTRIES = 20000
+MAX_BYTES = 256 * 1024 * 1024
+TTL_SEC = 30 * 24 * 3600
+EXPIRE_INTERVAL_SEC = 3600
+
+
+def make_cache_key(model: str, prompt: str, options=None) -> str:
+    raw = json.dumps(
+        {"model": model, "prompt": prompt, "options": options or {}},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        path=CACHE_PATH,
+        max_entries=MAX_ENTRIES,
+        max_bytes=MAX_BYTES,
+        ttl_sec=TTL_SEC
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_access "
+            "ON responses(last_access)"
+        )
+        self._conn.commit()
+
+        self._count = 0
+        self._bytes = 0
+        self._last_expire = float("-inf")
+        with self._lock:
+            self._expire(time.time())
+            self._conn.commit()
+
+    # ---------------------------------------------------------
+    # Lookup / store
+    # ---------------------------------------------------------
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, size, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, size, created_at = row
+            if self.ttl_sec and now - created_at > self.ttl_sec:
+                self._delete(key, size)
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now)
+            )
+            if old is None:
+                self._count += 1
+            else:
+                self._bytes -= old[0]
+            self._bytes += size
+
+            if now - self._last_expire >= EXPIRE_INTERVAL_SEC:
+                self._expire(now)
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """
+        Drop one entry (e.g. a response the caller could not use).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._delete(key, row[0])
+                self._conn.commit()
+
+    # ---------------------------------------------------------
+    # Eviction (caller holds the lock)
+    # ---------------------------------------------------------
+
+    def _delete(self, key, size):
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._count -= 1
+        self._bytes -= size
+
+    def _expire(self, now):
+        if self.ttl_sec:
+            cur = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.ttl_sec,)
+            )
+            self.evictions += max(0, cur.rowcount)
+        self._last_expire = now
+
+        # full recount only here, once per sweep
+        self._count, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def _evict(self):
+        if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        doomed = []
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        )
+        for key, size in rows:
+            if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self._count -= 1
+            self._bytes -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    # ---------------------------------------------------------
+    # Stats / maintenance
+    # ---------------------------------------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": count,
+            "bytes": total
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._count = 0
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---------------------------------------------------------
+# Shared default cache
+# ---------------------------------------------------------
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
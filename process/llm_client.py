@@ -0,0 +1,342 @@
+"""
+Shared Ollama client.
+
+One place to configure model, URL and timeouts. Holds a pooled
+requests.Session so calls reuse TCP connections, caps the number of
+in-flight requests, and retries timeouts / connection errors / 5xx with
+jittered exponential backoff. Responses are served from / written to the
+persistent LLM response cache (process/llm_cache.py) when one is attached.
+A caller that cannot use a response (unparseable, wrong shape) calls
+invalidate() with the same arguments, so a re-run asks the model again
+instead of replaying the failure from the cache.
+
+With stop_at_json=True the request is streamed (NDJSON) and closed as soon
+as a complete top-level JSON value has arrived, so trailing chatter after
+the closing bracket is never generated. stop_at_json="{" (or "[") waits
+for a value of that kind only, so "[1]" in leading prose does not end an
+object response early. Setting cancel_event aborts a
+queued or streaming request with LLMCancelled. Passing schema= sends a
+JSON schema as Ollama's structured-output "format" (see
+process/structured_output.py).
+
+Sync:   generate(prompt)
+Async:  await agenerate(prompt)
+"""
+import asyncio
+import random
+import threading
+import time
+
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from process.llm_cache import get_response_cache, make_cache_key
+from process.text_utils import JsonCompletionDetector
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+MODEL = "mistral"
+
+TIMEOUT = 180
+RETRIES = 2
+MAX_IN_FLIGHT = 4
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 20.0
+CACHE_ENABLED = True
+STREAM_JSON = True
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+class LLMCancelled(LLMError):
+    pass
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code} from LLM server")
+        self.response = response
+
+
+def _to_text(data) -> str:
+    # ---- HARD INVARIANT: always return str ----
+    if isinstance(data, list):
+        return "\n".join(str(x) for x in data)
+    if data is None:
+        return ""
+    if not isinstance(data, str):
+        return str(data)
+    return data
+
+
+class OllamaClient:
+    def __init__(
+        self,
+        url=OLLAMA_URL,
+        model=MODEL,
+        timeout=TIMEOUT,
+        retries=RETRIES,
+        max_in_flight=MAX_IN_FLIGHT,
+        backoff_base=BACKOFF_BASE_SEC,
+        backoff_max=BACKOFF_MAX_SEC,
+        cache=None,
+        stream_json=STREAM_JSON
+    ):
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.retries = retries
+        self.max_in_flight = max_in_flight
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.stream_json = stream_json
+
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_in_flight
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    # ---------------------------------------------------------
+    # Low-level request (one attempt)
+    # ---------------------------------------------------------
+
+    def _post(self, payload, timeout):
+        response = self._session.post(self.url, json=payload, timeout=timeout)
+        if response.status_code >= 500:
+            raise _RetryableStatus(response)
+        response.raise_for_status()
+        return _to_text(response.json().get("response"))
+
+    def _post_streaming(self, payload, timeout, cancel_event=None, expect=None):
+        detector = JsonCompletionDetector(expect)
+        response = self._session.post(
+            self.url, json=payload, timeout=timeout, stream=True
+        )
+        try:
+            if response.status_code >= 500:
+                raise _RetryableStatus(response)
+            response.raise_for_status()
+
+            for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LLMCancelled("LLM request cancelled")
+                if not line:
+                    continue
+                event = json.loads(line)
+                if detector.feed(_to_text(event.get("response"))):
+                    # closing the connection makes Ollama abort generation
+                    break
+                if event.get("done"):
+                    break
+        finally:
+            response.close()
+
+        return detector.value_text()
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        # full jitter keeps parallel workers from retrying in lockstep
+        return random.uniform(0, delay)
+
+    # ---------------------------------------------------------
+    # Public entry points
+    # ---------------------------------------------------------
+
+    def generate(
+        self,
+        prompt: str,
+        timeout=None,
+        options=None,
+        use_cache=True,
+        stop_at_json=False,
+        cancel_event=None,
+        schema=None
+    ) -> str:
+        stream = self._stream_expect(stop_at_json)
+
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(prompt, options, stream, schema)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        text = self._generate_uncached(
+            prompt, timeout, options, stream, cancel_event, schema
+        )
+
+        if cache_key is not None and text:
+            self.cache.put(cache_key, self.model, text)
+
+        return text
+
+    def _stream_expect(self, stop_at_json):
+        # None: plain request; otherwise the openers the stream may stop on
+        if not stop_at_json or not self.stream_json:
+            return None
+        return stop_at_json if stop_at_json in ("{", "[") else "{["
+
+    def _cache_key(self, prompt, options, stream, schema):
+        key_options = dict(options or {})
+        if stream:
+            # truncated responses must not be served to full-text callers
+            key_options["_stop_at_json"] = True if stream == "{[" else stream
+        if schema is not None:
+            key_options["_format"] = schema
+        return make_cache_key(self.model, prompt, key_options)
+
+    def invalidate(self, prompt: str, options=None, stop_at_json=False, schema=None):
+        """
+        Drop the cached response of a generate() call made with the same
+        arguments.
+        """
+        if self.cache is not None:
+            stream = self._stream_expect(stop_at_json)
+            self.cache.delete(self._cache_key(prompt, options, stream, schema))
+
+    def _generate_uncached(self, prompt, timeout, options, stream, cancel_event, schema=None):
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream is not None
+        }
+        if options:
+            payload["options"] = options
+        if schema is not None:
+            payload["format"] = schema
+
+        timeout = timeout or self.timeout
+        last_error = None
+
+        for attempt in range(self.retries + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise LLMCancelled("LLM request cancelled")
+
+            try:
+                with self._slots:
+                    if stream:
+                        return self._post_streaming(payload, timeout, cancel_event, stream)
+                    return self._post(payload, timeout)
+
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                _RetryableStatus
+            ) as e:
+                last_error = e
+                print(f"[WARN] LLM call failed: {e} (attempt {attempt + 1}/{self.retries + 1})")
+                if attempt < self.retries:
+                    time.sleep(self._backoff(attempt))
+
+        raise LLMError(f"LLM failed after retries: {last_error}")
+
+    async def agenerate(
+        self,
+        prompt: str,
+        timeout=None,
+        options=None,
+        use_cache=True,
+        stop_at_json=False,
+        schema=None
+    ) -> str:
+        # Blocking I/O runs on the default executor; the in-flight cap is
+        # shared with sync callers through the same semaphore.
+        return await asyncio.to_thread(
+            self.generate, prompt, timeout, options, use_cache, stop_at_json,
+            None, schema
+        )
+
+    def close(self):
+        self._session.close()
+
+
+# ---------------------------------------------------------
+# Shared default client
+# ---------------------------------------------------------
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _default_cache():
+    return get_response_cache() if CACHE_ENABLED else None
+
+
+def get_client() -> OllamaClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient(cache=_default_cache())
+        return _client
+
+
+def configure(**kwargs) -> OllamaClient:
+    """
+    Replace the shared client, e.g. configure(url=..., max_in_flight=8).
+    Unspecified settings keep their module defaults; pass cache=None
+    explicitly to disable response caching.
+    """
+    global _client
+    if "cache" not in kwargs:
+        kwargs["cache"] = _default_cache()
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = OllamaClient(**kwargs)
+        return _client
+
+
+def generate(
+    prompt: str,
+    timeout=None,
+    options=None,
+    use_cache=True,
+    stop_at_json=False,
+    cancel_event=None,
+    schema=None
+) -> str:
+    return get_client().generate(
+        prompt,
+        timeout=timeout,
+        options=options,
+        use_cache=use_cache,
+        stop_at_json=stop_at_json,
+        cancel_event=cancel_event,
+        schema=schema
+    )
+
+
+def invalidate(prompt: str, options=None, stop_at_json=False, schema=None):
+    get_client().invalidate(
+        prompt,
+        options=options,
+        stop_at_json=stop_at_json,
+        schema=schema
+    )
+
+
+async def agenerate(
+    prompt: str,
+    timeout=None,
+    options=None,
+    use_cache=True,
+    stop_at_json=False,
+    schema=None
+) -> str:
+    return await get_client().agenerate(
+        prompt,
+        timeout=timeout,
+        options=options,
+        use_cache=use_cache,
+        stop_at_json=stop_at_json,
+        schema=schema
+    )
@@ -1,9 +1,10 @@
-import requests
-import json
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL = "mistral"
+from process import llm_client, structured_output
+from process.llm_client import LLMCancelled
+from process.json_scanner import loads_tolerant
+from process.text_utils import chunk_sentences
 
 ALLOWED_TYPES = [
     "Definition",
@@ -14,71 +15,48 @@ ALLOWED_TYPES = [
     "Pitfall"
 ]
 
-TIMEOUT = 180
-RETRIES = 2
-CHUNK_SIZE = 2000
+CHUNK_TOKENS = 700
+CHUNK_OVERLAP_TOKENS = 60
 MAX_CONCEPTS = 20
+CHUNK_FANOUT = 4
 
 
 # ---------------------------------------------------------
-# Low-level LLM call (safe, retryable)
+# Low-level LLM call (shared pooled client, retryable)
 # ---------------------------------------------------------
 
-def run_llm_text(prompt: str) -> str:
-    last_error = None
-
-    for attempt in range(RETRIES + 1):
-        try:
-            response = requests.post(
-                OLLAMA_URL,
-                json={
-                    "model": MODEL,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json().get("response")
-
-            # ---- HARD INVARIANT: always return str ----
-            if isinstance(data, list):
-                return "\n".join(str(x) for x in data)
-
-            if data is None:
-                return ""
+def run_llm_text(prompt: str, stop_at_json=False, cancel_event=None) -> str:
+    return llm_client.generate(
+        prompt,
+        stop_at_json=stop_at_json,
+        cancel_event=cancel_event
+    )
 
-            if not isinstance(data, str):
-                return str(data)
-
-            return data
-
-        except requests.exceptions.ReadTimeout as e:
-            last_error = e
-            print(f"[WARN] LLM timeout (attempt {attempt + 1}/{RETRIES + 1})")
-            time.sleep(2)
-
-    raise RuntimeError(f"LLM failed after retries: {last_error}")
-    
 
 # ---------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------
 
-def chunk_text(text: str, size: int = CHUNK_SIZE):
-    for i in range(0, len(text), size):
-        yield text[i:i + size]
+def chunk_text(
+    text: str,
+    max_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+):
+    # Sentence-packed, de-duplicated chunks (see text_utils.chunk_sentences)
+    yield from chunk_sentences(text, max_tokens, overlap_tokens)
 
 
 def extract_json_safely(text: str):
-    start = text.find("{")
-    end = text.rfind("}")
+    return loads_tolerant(text, expect="{")
 
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("No JSON found in LLM response")
 
-    return json.loads(text[start:end + 1])
+def _valid_record(c):
+    # the merge lower-cases names; anything else (null, numbers) is dropped here
+    return (
+        isinstance(c, dict)
+        and isinstance(c.get("name"), str) and c["name"].strip() != ""
+        and isinstance(c.get("type"), str) and c["type"].strip() != ""
+    )
 
 
 # ---------------------------------------------------------
@@ -116,29 +94,69 @@ RULES:
 - Output JSON ONLY
 """
 
-    collected = []
-    seen = set()
+    chunks = list(chunk_text(raw_text))
+    cancel = threading.Event()
 
-    for idx, chunk in enumerate(chunk_text(raw_text)):
+    def process_chunk(idx, chunk):
         print(f"[LLM] Processing chunk {idx + 1}")
-
         prompt = system_prompt + "\nTEXT:\n" + chunk
+        if structured_output.USE_SCHEMAS:
+            parsed = structured_output.generate_validated(
+                prompt,
+                structured_output.concept_list_schema(ALLOWED_TYPES),
+                cancel_event=cancel,
+                label=f"chunk {idx + 1}"
+            )
+        else:
+            raw_output = run_llm_text(prompt, stop_at_json="{", cancel_event=cancel)
+            try:
+                parsed = extract_json_safely(raw_output)
+            except ValueError:
+                llm_client.invalidate(prompt, stop_at_json="{")
+                raise
+        return [c for c in parsed.get("concepts", []) if _valid_record(c)]
 
-        try:
-            raw_output = run_llm_text(prompt)
-            parsed = extract_json_safely(raw_output)
-
-            for c in parsed.get("concepts", []):
-                key = (c["name"].lower(), c["type"])
-                if key not in seen:
-                    seen.add(key)
-                    collected.append(c)
-
-        except Exception as e:
-            print(f"[WARN] Skipping chunk {idx + 1}: {e}")
+    collected = []
+    seen = set()
 
-        if len(collected) >= MAX_CONCEPTS:
-            break
+    # Chunk results are merged strictly in chunk order, so the final list
+    # matches a serial run no matter which request finishes first.
+    finished = {}
+    next_idx = 0
+
+    executor = ThreadPoolExecutor(max_workers=max(1, CHUNK_FANOUT))
+    try:
+        futures = {
+            executor.submit(process_chunk, idx, chunk): idx
+            for idx, chunk in enumerate(chunks)
+        }
+
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                finished[idx] = future.result()
+            except LLMCancelled:
+                finished[idx] = []
+            except Exception as e:
+                print(f"[WARN] Skipping chunk {idx + 1}: {e}")
+                finished[idx] = []
+
+            while next_idx in finished and len(collected) < MAX_CONCEPTS:
+                for c in finished.pop(next_idx):
+                    key = (c["name"].lower(), c["type"])
+                    if key not in seen:
+                        seen.add(key)
+                        collected.append(c)
+                next_idx += 1
+
+            if len(collected) >= MAX_CONCEPTS:
+                # cap reached: drop queued chunks and abort in-flight streams
+                cancel.set()
+                for f in futures:
+                    f.cancel()
+                break
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
     return {
         "concepts": collected[:MAX_CONCEPTS]
@@ -177,5 +195,9 @@ RULES:
 - Output JSON ONLY
 """
     payload = system_prompt + "\nTEXT:\n" + raw_text[:6000]
-    output = run_llm_text(payload)
-    return extract_json_safely(output)
+    output = run_llm_text(payload, stop_at_json="{")
+    try:
+        return extract_json_safely(output)
+    except ValueError:
+        llm_client.invalidate(payload, stop_at_json="{")
+        raise
@@ -0,0 +1,178 @@
+"""
+Slotted records passed between pipeline stages.
+
+Concept → ConceptKnowledge → Atom / AtomFeed. Identifying strings
+(topic, concept, type, atom_type, difficulty) are interned, so the
+thousands of atoms of a long-running process share one copy of each
+topic/concept name. Keys are checked once, in the constructors;
+to_dict()/from_dict() convert to and from the JSON shapes written
+under output/, which are unchanged. Keys a record does not know about
+are kept in `extra` (None when there are none) and written back out.
+"""
+import sys
+from dataclasses import dataclass, field
+
+
+def _intern(value, what):
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{what} must be a non-empty string, got {value!r}")
+    return sys.intern(value)
+
+
+def _intern_optional(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class Concept:
+    concept: str
+    type: str
+    confidence: float = None
+
+    def __post_init__(self):
+        self.concept = _intern(self.concept, "concept")
+        self.type = _intern(self.type, "type")
+
+    @classmethod
+    def from_dict(cls, d):
+        # LLM output uses "name"; stored concepts use "concept"
+        return cls(d.get("concept") or d.get("name"), d.get("type"), d.get("confidence"))
+
+    @classmethod
+    def coerce(cls, value):
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+    def to_dict(self):
+        d = {"concept": self.concept, "type": self.type}
+        if self.confidence is not None:
+            d["confidence"] = self.confidence
+        return d
+
+
+_KNOWLEDGE_KEYS = ("concept", "type", "knowledge", "provenance")
+
+
+@dataclass(slots=True)
+class ConceptKnowledge:
+    concept: str
+    type: str
+    knowledge: dict
+    provenance: dict = None
+    extra: dict = None
+
+    def __post_init__(self):
+        self.concept = _intern(self.concept, "concept")
+        self.type = _intern(self.type, "type")
+        if self.knowledge is None:
+            raise ValueError(f"knowledge missing for {self.concept!r}")
+
+    @classmethod
+    def from_dict(cls, d):
+        if not isinstance(d, dict):
+            raise ValueError(f"concept knowledge must be an object, got {type(d).__name__}")
+        return cls(
+            d.get("concept"),
+            d.get("type"),
+            d.get("knowledge"),
+            d.get("provenance"),
+            {k: v for k, v in d.items() if k not in _KNOWLEDGE_KEYS} or None
+        )
+
+    @classmethod
+    def coerce(cls, value):
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+    def to_dict(self):
+        d = {"concept": self.concept, "type": self.type, "knowledge": self.knowledge}
+        if self.provenance is not None:
+            d["provenance"] = self.provenance
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+_ATOM_KEYS = (
+    "topic",
+    "concept",
+    "atom_type",
+    "content",
+    "difficulty",
+    "estimated_read_time_sec",
+    "order"
+)
+
+
+@dataclass(slots=True)
+class Atom:
+    topic: str
+    concept: str
+    atom_type: str
+    content: str
+    difficulty: str = "easy"
+    estimated_read_time_sec: int = None
+    order: int = 0
+    extra: dict = None
+
+    def __post_init__(self):
+        self.topic = _intern(self.topic, "topic")
+        self.concept = _intern(self.concept, "concept")
+        self.atom_type = _intern(self.atom_type, "atom_type")
+        self.difficulty = _intern_optional(self.difficulty)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            d.get("topic"),
+            d.get("concept"),
+            d.get("atom_type"),
+            d.get("content", ""),
+            d.get("difficulty"),
+            d.get("estimated_read_time_sec"),
+            d.get("order", 0),
+            {k: v for k, v in d.items() if k not in _ATOM_KEYS} or None
+        )
+
+    @classmethod
+    def coerce(cls, value):
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+    def copy(self):
+        return Atom(
+            self.topic, self.concept, self.atom_type, self.content,
+            self.difficulty, self.estimated_read_time_sec, self.order,
+            dict(self.extra) if self.extra else None
+        )
+
+    def to_dict(self):
+        d = {
+            "topic": self.topic,
+            "concept": self.concept,
+            "atom_type": self.atom_type,
+            "content": self.content,
+            "difficulty": self.difficulty,
+            "estimated_read_time_sec": self.estimated_read_time_sec,
+            "order": self.order
+        }
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+@dataclass(slots=True)
+class AtomFeed:
+    topic: str
+    atoms: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.topic = _intern(self.topic, "topic")
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["topic"], [Atom.coerce(a) for a in d.get("atoms", [])])
+
+    @classmethod
+    def coerce(cls, value):
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+    def to_dict(self):
+        return {"topic": self.topic, "atoms": [a.to_dict() for a in self.atoms]}
@@ -0,0 +1,227 @@
+"""
+Pipelined knowledge → atoms stages.
+
+Knowledge resolution runs on its own bounded pool (see
+resolve_concept_knowledge_concurrent). Resolved concepts are collected
+into groups under the same token budget as generate_atom_bundles, and
+each full group goes to the atom pool as one batched prompt while
+resolution continues; the last partial group is sent when resolution
+ends. The raw partial feed is saved at most every PARTIAL_SAVE_SEC;
+curation happens once, on the final feed. The final feed is assembled
+in concept order, so it matches a stage-by-stage run.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from process.atom_bundle_generator import (
+    BATCH_TOKEN_BUDGET,
+    MAX_BATCH_CONCEPTS,
+    generate_atom_bundles,
+    knowledge_tokens
+)
+from process.knowledge_resolver import (
+    KNOWLEDGE_WORKERS,
+    KNOWLEDGE_DEADLINE_SEC,
+    resolve_concept_knowledge_concurrent
+)
+from storage.atom_store import save_atoms
+from storage.concept_knowledge_store import (
+    load_concept_knowledge,
+    save_concept_knowledge
+)
+from process.models import Atom, AtomFeed, Concept
+from storage.run_manifest import content_hash
+
+ATOM_WORKERS = 2
+
+# Minimum seconds between partial feed saves while bundles arrive
+PARTIAL_SAVE_SEC = 30
+
+
+def _ordered_atoms(bundles):
+    """
+    Flatten bundles (None for missing) in concept order with fresh orders.
+    """
+    atoms = []
+    for bundle in bundles:
+        for atom in bundle or []:
+            atom.order = len(atoms) + 1
+            atoms.append(atom)
+    return atoms
+
+
+class _IncrementalFeed:
+    """
+    Collects bundles as they finish (any order). When saving is on, the
+    first finished bundle is written at once and the raw feed so far at
+    most every PARTIAL_SAVE_SEC after that.
+    """
+
+    def __init__(self, topic, size, save=True, interval=PARTIAL_SAVE_SEC):
+        self.topic = topic
+        self.bundles = [None] * size
+        self.save = save
+        self.interval = interval
+        self._last_save = float("-inf")
+        self._lock = threading.Lock()
+
+    def add(self, index, bundle):
+        with self._lock:
+            self.bundles[index] = bundle
+            if not self.save or time.monotonic() - self._last_save < self.interval:
+                return
+            save_atoms(self.topic, AtomFeed(self.topic, _ordered_atoms(self.bundles)))
+            self._last_save = time.monotonic()
+
+
+def knowledge_inputs_hash(concept, context_hash):
+    """
+    What a knowledge unit was built from: the concept record plus the
+    hash of the source text it was extracted against.
+    """
+    return content_hash({
+        "concept": Concept.coerce(concept).to_dict(),
+        "context": context_hash
+    })
+
+
+def restore_checkpointed_knowledge(manifest, topic, concepts, semantic_context):
+    """
+    Put knowledge units recorded in the run manifest back into the
+    per-topic store (they may not have been flushed before a crash), so
+    the cache-first resolver skips them. Units built from a different
+    concept record or source text are ignored. Returns how many were
+    restored.
+    """
+    context_hash = content_hash(semantic_context)
+    restored = 0
+    for c in concepts:
+        c = Concept.coerce(c)
+        if load_concept_knowledge(topic, c.concept):
+            continue
+        knowledge = manifest.unit(
+            "knowledge", c.concept, knowledge_inputs_hash(c, context_hash)
+        )
+        if knowledge:
+            save_concept_knowledge(topic, knowledge)
+            restored += 1
+    if restored:
+        print(f"[RESUME] Restored knowledge for {restored} concepts")
+    return restored
+
+
+def _generate_timed(topic, knowledge_list):
+    start = time.perf_counter()
+    bundles = generate_atom_bundles(topic, knowledge_list)
+    return bundles, time.perf_counter() - start
+
+
+def run_knowledge_atom_pipeline(
+    topic,
+    concepts,
+    semantic_context,
+    knowledge_workers=KNOWLEDGE_WORKERS,
+    atom_workers=ATOM_WORKERS,
+    deadline_sec=KNOWLEDGE_DEADLINE_SEC,
+    save_partial=True,
+    manifest=None
+):
+    """
+    Resolve knowledge and generate atoms with overlapping stages.
+
+    Returns (concept_knowledge_list, atoms, report): the knowledge list
+    and report are exactly what resolve_concept_knowledge_concurrent
+    returns; atoms are the raw (uncurated) Atom records in concept order.
+
+    With a RunManifest, knowledge and bundles are checkpointed per
+    concept, and a bundle whose knowledge hash still matches is reused
+    instead of generated.
+    """
+    concepts = [Concept.coerce(c) for c in concepts]
+    context_hash = None
+    if manifest is not None:
+        context_hash = content_hash(semantic_context)
+        restore_checkpointed_knowledge(manifest, topic, concepts, semantic_context)
+
+    feed = _IncrementalFeed(topic, len(concepts), save=save_partial)
+    executor = ThreadPoolExecutor(max_workers=max(1, atom_workers))
+    futures = []
+
+    # resolved concepts waiting for a batch: (index, knowledge, hash)
+    group = []
+    group_tokens = 0
+
+    def _on_atoms(members, future):
+        try:
+            bundles, elapsed = future.result()
+        except Exception as e:
+            names = ", ".join(k.concept for _, k, _ in members)
+            print(f"[WARN] Atom generation failed for {names}: {e}")
+            return
+        for (index, knowledge, knowledge_hash), bundle in zip(members, bundles):
+            if bundle is None:
+                continue
+            print(f"[ATOMS] {knowledge.concept} → {len(bundle)} atoms ({elapsed:.1f}s)")
+            if manifest is not None:
+                manifest.complete_unit(
+                    "bundle", knowledge.concept,
+                    [a.to_dict() for a in bundle], knowledge_hash
+                )
+            feed.add(index, bundle)
+
+    def _submit_group():
+        nonlocal group, group_tokens
+        if not group:
+            return
+        members = group
+        group, group_tokens = [], 0
+        future = executor.submit(_generate_timed, topic, [k for _, k, _ in members])
+        future.add_done_callback(lambda f: _on_atoms(members, f))
+        futures.append(future)
+
+    def _on_resolved(index, knowledge):
+        nonlocal group_tokens
+        knowledge_hash = None
+
+        if manifest is not None:
+            stored = knowledge.to_dict()
+            knowledge_hash = content_hash(stored)
+            manifest.complete_unit(
+                "knowledge", concepts[index].concept, stored,
+                knowledge_inputs_hash(concepts[index], context_hash)
+            )
+            # bundles are keyed by the knowledge's own name, like the
+            # batched path in main.py
+            bundle = manifest.unit("bundle", knowledge.concept, knowledge_hash)
+            if bundle is not None:
+                print(f"[RESUME] {knowledge.concept} → {len(bundle)} atoms (checkpoint)")
+                feed.add(index, [Atom.from_dict(a) for a in bundle])
+                return
+
+        # same packing rule as generate_atom_bundles' batch planner
+        tokens = knowledge_tokens(knowledge)
+        if group and group_tokens + tokens > BATCH_TOKEN_BUDGET:
+            _submit_group()
+        group.append((index, knowledge, knowledge_hash))
+        group_tokens += tokens
+        if len(group) >= MAX_BATCH_CONCEPTS:
+            _submit_group()
+
+    try:
+        concept_knowledge_list, report = resolve_concept_knowledge_concurrent(
+            topic=topic,
+            concepts=concepts,
+            semantic_context=semantic_context,
+            max_workers=knowledge_workers,
+            deadline_sec=deadline_sec,
+            on_resolved=_on_resolved
+        )
+        # knowledge stage is done; send the last partial group and
+        # drain the atom stage
+        _submit_group()
+        wait(futures)
+    finally:
+        executor.shutdown(wait=True)
+
+    return concept_knowledge_list, _ordered_atoms(feed.bundles), report
@@ -0,0 +1,314 @@
+"""
+Schema-constrained generation.
+
+Builds JSON schemas for each LLM stage (concept lists, concept knowledge
+from KNOWLEDGE_CONTRACTS, atom bundles), sends them as Ollama's
+structured-output "format", validates what comes back, and re-prompts
+only for the fields that failed validation instead of regenerating (or
+dropping) the whole response.
+
+Off by default: set USE_SCHEMAS = True (or run main.py --schema).
+"""
+import json
+
+from process import llm_client
+from process.json_scanner import loads_tolerant
+from process.knowledge_contracts import KNOWLEDGE_CONTRACTS
+
+USE_SCHEMAS = False
+
+# Re-prompts allowed per response before giving up
+REPAIR_ROUNDS = 1
+
+CONCEPT_TYPES = [
+    "Definition",
+    "Principle",
+    "Operation",
+    "Complexity",
+    "Application",
+    "Pitfall"
+]
+
+ATOM_TYPES = [
+    "explanation",
+    "mental_model",
+    "example",
+    "key_points",
+    "pitfall",
+    "why_it_matters",
+    "quick_check"
+]
+
+
+class SchemaError(ValueError):
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{_pointer(p)}: {m}" for p, m in errors[:5]))
+        self.errors = errors
+
+
+# ---------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------
+
+_TEXT = {"type": "string", "minLength": 1}
+_TEXT_OR_LIST = {
+    "anyOf": [_TEXT, {"type": "array", "items": {"type": "string"}, "minItems": 1}]
+}
+
+
+def concept_list_schema(allowed_types=CONCEPT_TYPES):
+    return {
+        "type": "object",
+        "properties": {
+            "concepts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": _TEXT,
+                        "type": {"type": "string", "enum": list(allowed_types)},
+                        "confidence": {"type": "number", "minimum": 0, "maximum": 1}
+                    },
+                    "required": ["name", "type", "confidence"]
+                }
+            }
+        },
+        "required": ["concepts"]
+    }
+
+
+def knowledge_schema(concept, concept_type):
+    """
+    summary + key_points for every concept, plus the contract fields of
+    its type (KNOWLEDGE_CONTRACTS).
+    """
+    contract = KNOWLEDGE_CONTRACTS.get(concept_type, [])
+    properties = {
+        "summary": _TEXT,
+        "key_points": {"type": "array", "items": _TEXT, "minItems": 2},
+        "common_confusion": {"type": "string"}
+    }
+    for field in contract:
+        properties[field] = _TEXT_OR_LIST
+
+    return {
+        "type": "object",
+        "properties": {
+            "concept": {"type": "string", "enum": [concept]},
+            "type": {"type": "string", "enum": [concept_type]},
+            "knowledge": {
+                "type": "object",
+                "properties": properties,
+                "required": ["summary", "key_points"] + list(contract)
+            }
+        },
+        "required": ["concept", "type", "knowledge"]
+    }
+
+
+def atom_list_schema(min_items=6, max_items=10):
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "atom_type": {"type": "string", "enum": ATOM_TYPES},
+                "content": _TEXT
+            },
+            "required": ["atom_type", "content"]
+        },
+        "minItems": min_items,
+        "maxItems": max_items
+    }
+
+
+def atom_batch_schema(concept_names):
+    return {
+        "type": "object",
+        "properties": {name: atom_list_schema() for name in concept_names},
+        "required": list(concept_names)
+    }
+
+
+# ---------------------------------------------------------
+# Validation (the subset of JSON Schema used above)
+# ---------------------------------------------------------
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _is_type(value, name):
+    if name == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if name == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, _TYPES[name])
+
+
+def validate(value, schema, path=()):
+    """
+    List of (path, message) for every violation; empty when valid.
+    path is a tuple of keys / indices from the root.
+    """
+    if "anyOf" in schema:
+        if any(not validate(value, s, path) for s in schema["anyOf"]):
+            return []
+        return [(path, "does not match any allowed form")]
+
+    expected = schema.get("type")
+    if expected and not _is_type(value, expected):
+        return [(path, f"expected {expected}, got {type(value).__name__}")]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append((path, f"must be one of {schema['enum']}"))
+
+    if isinstance(value, str) and len(value.strip()) < schema.get("minLength", 0):
+        errors.append((path, "must not be empty"))
+
+    if _is_type(value, "number"):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append((path, f"must be >= {schema['minimum']}"))
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append((path, f"must be <= {schema['maximum']}"))
+
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append((path + (key,), "missing"))
+        for key, sub in properties.items():
+            if key in value:
+                errors.extend(validate(value[key], sub, path + (key,)))
+
+    if isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append((path, f"needs at least {schema['minItems']} items"))
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append((path, f"allows at most {schema['maxItems']} items"))
+        if "items" in schema:
+            for i, item in enumerate(value):
+                errors.extend(validate(item, schema["items"], path + (i,)))
+
+    return errors
+
+
+def _pointer(path):
+    return "/" + "/".join(str(p) for p in path)
+
+
+def _subschema(schema, path):
+    for key in path:
+        if "anyOf" in schema:
+            return schema
+        if isinstance(key, int):
+            schema = schema.get("items", {})
+        else:
+            schema = schema.get("properties", {}).get(key, {})
+    return schema
+
+
+def _set_path(value, path, new):
+    if not path:
+        return new
+    target = value
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = new
+    return value
+
+
+# ---------------------------------------------------------
+# Generate → validate → targeted repair
+# ---------------------------------------------------------
+
+REPAIR_PROMPT = """
+{original}
+
+Your previous answer was:
+{answer}
+
+These fields are invalid:
+{problems}
+
+Return ONLY a JSON object whose keys are exactly the field paths above
+and whose values are the corrected values for those fields. Do not
+repeat the other fields.
+"""
+
+
+def _repair(prompt, value, schema, errors, timeout, cancel_event):
+    # one correction per path; a deeper error under a bad parent is
+    # covered by fixing the parent
+    paths = []
+    for path, _ in errors:
+        if not any(path[:len(p)] == p for p in paths):
+            paths = [p for p in paths if p[:len(path)] != path] + [path]
+
+    fix_schema = {
+        "type": "object",
+        "properties": {_pointer(p): _subschema(schema, p) for p in paths},
+        "required": [_pointer(p) for p in paths]
+    }
+    problems = "\n".join(f"- {_pointer(p)}: {m}" for p, m in errors)
+
+    text = llm_client.generate(
+        REPAIR_PROMPT.format(
+            original=prompt.strip(),
+            answer=json.dumps(value, ensure_ascii=False),
+            problems=problems
+        ),
+        timeout=timeout,
+        stop_at_json="{",
+        cancel_event=cancel_event,
+        schema=fix_schema
+    )
+    fixes = loads_tolerant(text, expect="{")
+
+    for path in paths:
+        pointer = _pointer(path)
+        if pointer in fixes:
+            try:
+                value = _set_path(value, path, fixes[pointer])
+            except (KeyError, IndexError, TypeError):
+                pass
+    return value
+
+
+def generate_validated(prompt, schema, timeout=None, cancel_event=None, label="output"):
+    """
+    Generate with `schema` as the Ollama format, validate the parsed
+    result, and re-prompt for just the invalid fields (up to
+    REPAIR_ROUNDS times). Raises SchemaError if it still does not match.
+    """
+    text = llm_client.generate(
+        prompt,
+        timeout=timeout,
+        stop_at_json=True,
+        cancel_event=cancel_event,
+        schema=schema
+    )
+    try:
+        value = loads_tolerant(text)
+        errors = validate(value, schema)
+
+        for _ in range(REPAIR_ROUNDS):
+            if not errors:
+                break
+            print(f"[SCHEMA] Repairing {len(errors)} invalid field(s) in {label}")
+            value = _repair(prompt, value, schema, errors, timeout, cancel_event)
+            errors = validate(value, schema)
+
+        if errors:
+            raise SchemaError(errors)
+    except ValueError:
+        # the cached answer is what failed; let a re-run ask again
+        llm_client.invalidate(prompt, stop_at_json=True, schema=schema)
+        raise
+    return value
@@ -1,3 +1,8 @@
+import re
+
+from process.json_scanner import is_complete_json, loads_tolerant
+
+
 def normalize_text(value):
     if isinstance(value, list):
         return "\n".join(str(v) for v in value)
@@ -10,51 +15,218 @@ def safe_split_lines(value):
     return normalize_text(value).split("\n")
 
 
-def clean_json_text(text):
-    import re
-    # 1. Remove markdown code blocks
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
-    
-    # 2. Fix invalid backslashes
-    # Replace \ that is NOT followed by a valid escape char with \\
-    # Valid: " \ / b f n r t u
-    text = re.sub(r'\\(?![\\"/bfnrtu])', r'\\\\', text)
-    
-    # 3. Fix missing commas between objects/items
-    # Look for " closing a string, or } ] closing objects/arrays
-    # Followed by whitespace
-    # Followed by " { [ opening a new item
-    # And NOT preceded by a comma
-    text = re.sub(r'(?<=[}\]"\'0-9])\s+(?=["{\[])', ', ', text)
-    
-    return text
+def parse_json_garbage(text):
+    """
+    Parse the first JSON value in an LLM response, repairing common
+    defects on the way (see process.json_scanner). Raises ValueError.
+    """
+    return loads_tolerant(text)
 
 
-def parse_json_garbage(text):
-    import json
-    import ast
-    
-    # 1. Try standard JSON
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-    
-    # 2. Try cleaning JSON (fixes backslashes, missing commas)
-    cleaned = clean_json_text(text)
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-
-    # 3. Try ast.literal_eval (handles single quotes, Python-like syntax)
-    # We try on both original and cleaned text
-    for t in [text, cleaned]:
-        try:
-            return ast.literal_eval(t)
-        except (ValueError, SyntaxError):
-            pass
-            
-    # If all fail, raise the last error or a generic one
-    raise ValueError("Failed to parse JSON with all available methods.")
+# ---------------------------------------------------------
+# Chunking helpers (approximate tokens, sentence packing)
+# ---------------------------------------------------------
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])")
+
+
+def approx_token_count(text: str) -> int:
+    """
+    Cheap local stand-in for a BPE tokenizer: punctuation counts as one
+    token, words as roughly one token per four characters.
+    """
+    return sum(max(1, (len(w) + 3) // 4) for w in _WORD_RE.findall(text))
+
+
+def split_sentences(paragraph: str):
+    return [s.strip() for s in _SENTENCE_RE.split(paragraph) if s.strip()]
+
+
+def _shingles(words, size=3):
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def dedup_paragraphs(paragraphs, threshold=0.85):
+    """
+    Drop exact and near-identical paragraphs (word 3-shingle Jaccard >=
+    threshold), keeping the first occurrence. Candidates are found through
+    an inverted shingle index, so unrelated paragraphs are never compared.
+    """
+    kept = []
+    kept_shingles = []
+    seen_exact = set()
+    index = {}
+
+    for p in paragraphs:
+        words = re.findall(r"\w+", p.lower())
+        if not words:
+            continue
+
+        exact = " ".join(words)
+        if exact in seen_exact:
+            continue
+
+        shingles = _shingles(words)
+        candidates = set()
+        for sh in shingles:
+            candidates.update(index.get(sh, ()))
+
+        duplicate = False
+        for k in candidates:
+            other = kept_shingles[k]
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= threshold:
+                duplicate = True
+                break
+
+        if duplicate:
+            continue
+
+        seen_exact.add(exact)
+        idx = len(kept)
+        kept.append(p)
+        kept_shingles.append(shingles)
+        for sh in shingles:
+            index.setdefault(sh, []).append(idx)
+
+    return kept
+
+
+def _split_long_sentence(sentence, max_tokens):
+    piece = []
+    piece_tokens = 0
+    for word in sentence.split():
+        t = approx_token_count(word)
+        if piece and piece_tokens + t > max_tokens:
+            yield " ".join(piece)
+            piece = []
+            piece_tokens = 0
+        piece.append(word)
+        piece_tokens += t
+    if piece:
+        yield " ".join(piece)
+
+
+def chunk_sentences(text: str, max_tokens: int, overlap_tokens: int = 0):
+    """
+    Pack whole sentences into chunks of at most max_tokens (approximate).
+    Paragraphs are de-duplicated first; the last sentences of each chunk,
+    up to overlap_tokens, are repeated at the start of the next one.
+    """
+    paragraphs = dedup_paragraphs(
+        line.strip() for line in text.split("\n") if line.strip()
+    )
+
+    units = []
+    for p in paragraphs:
+        for sentence in split_sentences(p):
+            t = approx_token_count(sentence)
+            if t > max_tokens:
+                for part in _split_long_sentence(sentence, max_tokens):
+                    units.append((part, approx_token_count(part)))
+            else:
+                units.append((sentence, t))
+
+    current = []
+    current_tokens = 0
+
+    for sentence, t in units:
+        if current and current_tokens + t > max_tokens:
+            yield " ".join(s for s, _ in current)
+
+            carry = []
+            carry_tokens = 0
+            for s, st in reversed(current):
+                if carry_tokens + st > overlap_tokens or carry_tokens + st + t > max_tokens:
+                    break
+                carry.insert(0, (s, st))
+                carry_tokens += st
+
+            current = carry
+            current_tokens = carry_tokens
+
+        current.append((sentence, t))
+        current_tokens += t
+
+    if current:
+        yield " ".join(s for s, _ in current)
+
+
+class JsonCompletionDetector:
+    """
+    Incremental bracket balancer for streamed LLM output.
+
+    Feed text pieces as they arrive; feed() returns True once a complete
+    top-level JSON object or array has been seen. Brackets inside strings
+    are ignored. A balanced candidate that does not parse (e.g. "[note]"
+    in leading prose) is discarded and scanning resumes after it.
+    expect="{" or "[" only starts a value at that opener, matching
+    loads_tolerant(expect=...).
+    """
+
+    def __init__(self, expect=None):
+        self.openers = expect or "{["
+        self.text = ""
+        self.end = -1
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self):
+        return self.end != -1
+
+    def feed(self, piece: str) -> bool:
+        if self.complete:
+            return True
+
+        self.text += piece
+        text = self.text
+
+        while self._pos < len(text):
+            ch = text[self._pos]
+            self._pos += 1
+
+            if self._start == -1:
+                if ch in self.openers:
+                    self._start = self._pos - 1
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._is_json(text[self._start:self._pos]):
+                        self.end = self._pos
+                        return True
+                    self._start = -1
+
+        return False
+
+    def value_text(self) -> str:
+        """
+        Text up to the end of the completed value (everything if incomplete).
+        """
+        return self.text[:self.end] if self.complete else self.text
+
+    @staticmethod
+    def _is_json(candidate):
+        return is_complete_json(candidate)
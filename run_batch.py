@@ -0,0 +1,143 @@
+"""
+Generate feeds for many topics without prompting.
+
+Topics come from a text file (one per line, '#' comments) or a JSONL
+file whose records carry a "topic". Topics run on a worker pool; every run shares the same LLM
+client (response cache + MAX_IN_FLIGHT limit), HTTP session and cache,
+and knowledge base, so the Ollama server sees at most --llm-concurrency
+requests at a time no matter how many topics are in flight.
+
+Usage: python run_batch.py topics.txt [--workers 2] [--llm-concurrency 4]
+                           [--resume] [--schema]
+                           [--status output/batch_status.json]
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from main import run_topic, print_cache_stats
+from process import llm_client, structured_output
+from storage.knowledge_base import topic_key
+from storage.run_manifest import atomic_write_json
+
+STATUS_PATH = "output/batch_status.json"
+TOPIC_WORKERS = 2
+
+
+def load_topics(path):
+    """
+    Topic names in file order, without duplicates.
+
+    Raises ValueError for a JSONL record without a "topic" string, and
+    for two different topics that share an output slug (e.g. "Stack"
+    and "stack"), since their runs would overwrite each other's files.
+    """
+    topics = []
+    slugs = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{lineno}: invalid JSON ({e})") from None
+                topic = record.get("topic") if isinstance(record, dict) else None
+                if not isinstance(topic, str) or not topic.strip():
+                    raise ValueError(f'{path}:{lineno}: record has no "topic" string')
+                line = topic.strip()
+
+            if line in topics:
+                continue
+            slug = topic_key(line)
+            if slug in slugs:
+                raise ValueError(
+                    f"{path}:{lineno}: topic {line!r} collides with {slugs[slug]!r} "
+                    f"(both are saved as {slug!r})"
+                )
+            slugs[slug] = line
+            topics.append(line)
+    return topics
+
+
+def _run_one(topic, resume):
+    try:
+        return run_topic(topic, resume=resume)
+    except Exception as e:
+        print(f"[BATCH] {topic} failed: {e}")
+        return {"topic": topic, "status": "failed", "reason": str(e)}
+
+
+def run_batch(topics, workers=TOPIC_WORKERS, resume=False, status_path=STATUS_PATH):
+    """
+    Run every topic and return the status list (in `topics` order).
+    The status file is rewritten as each topic finishes.
+    """
+    start = time.perf_counter()
+    statuses = {t: {"topic": t, "status": "pending"} for t in topics}
+
+    def _write_status():
+        atomic_write_json(status_path, {
+            "elapsed_sec": round(time.perf_counter() - start, 2),
+            "topics": [statuses[t] for t in topics]
+        })
+
+    _write_status()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(_run_one, t, resume): t for t in topics}
+        for future in as_completed(futures):
+            topic = futures[future]
+            statuses[topic] = future.result()
+            _write_status()
+            print(f"[BATCH] {topic} → {statuses[topic]['status']}")
+
+    return [statuses[t] for t in topics]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build scroll feeds for a list of topics.")
+    parser.add_argument("topics_file", help="text file (one topic per line) or JSONL")
+    parser.add_argument("--workers", type=int, default=TOPIC_WORKERS,
+                        help="topics processed at the same time")
+    parser.add_argument("--llm-concurrency", type=int, default=llm_client.MAX_IN_FLIGHT,
+                        help="max Ollama requests in flight across all topics")
+    parser.add_argument("--resume", action="store_true",
+                        help="reuse checkpoints from earlier runs of each topic")
+    parser.add_argument("--status", default=STATUS_PATH,
+                        help="where to write the per-topic status summary")
+    parser.add_argument("--schema", action="store_true",
+                        help="constrain LLM output with JSON schemas")
+    args = parser.parse_args(argv)
+
+    try:
+        topics = load_topics(args.topics_file)
+    except ValueError as e:
+        parser.error(str(e))
+    if not topics:
+        print("[BATCH] No topics found.")
+        return
+
+    llm_client.configure(max_in_flight=args.llm_concurrency)
+    if args.schema:
+        structured_output.USE_SCHEMAS = True
+    print(
+        f"[BATCH] {len(topics)} topics, {args.workers} workers, "
+        f"{args.llm_concurrency} LLM requests in flight"
+    )
+
+    statuses = run_batch(topics, args.workers, args.resume, args.status)
+
+    counts = {}
+    for s in statuses:
+        counts[s["status"]] = counts.get(s["status"], 0) + 1
+    print("[BATCH] " + ", ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
+    print(f"[BATCH] Status → {args.status}")
+    print_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 import json
 import os
+from process.models import AtomFeed
+from storage.knowledge_base import get_knowledge_base
 
 
-def save_atoms(topic: str, atom_feed: dict):
+def save_atoms(topic: str, atom_feed):
+    """
+    atom_feed: AtomFeed or its dict form.
+    """
+    feed = AtomFeed.coerce(atom_feed)
     safe_topic = topic.replace(" ", "_").lower()
     os.makedirs("output", exist_ok=True)
 
     path = f"output/{safe_topic}_atoms.json"
 
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(atom_feed, f, indent=2, ensure_ascii=False)
+        json.dump(feed.to_dict(), f, indent=2, ensure_ascii=False)
+
+    get_knowledge_base().replace_atoms(topic, feed.atoms)
 
     print(f"[SAVED] Atom feed → {path}")
@@ -1,9 +1,17 @@
-import os
+import atexit
 import json
+import os
+import tempfile
+import threading
 from datetime import datetime
 from process.concept_normalizer import normalize_concept_name
+from storage.knowledge_base import get_knowledge_base
+
+BASE_DIR = os.path.join("output", "concept_knowledge")
 
-BASE_DIR = "output\concept_knowledge"
+# Saves are buffered in memory and written every FLUSH_EVERY changes,
+# plus once at the end of the stage via flush_concept_knowledge().
+FLUSH_EVERY = 10
 
 
 def _topic_path(topic: str) -> str:
@@ -11,63 +19,163 @@ def _topic_path(topic: str) -> str:
     return os.path.join(BASE_DIR, f"{safe}.json")
 
 
+def _valid(data) -> bool:
+    return isinstance(data, dict) and isinstance(data.get("concepts"), list)
+
+
+def _set_aside(path: str):
+    """
+    Move a corrupt topic file out of the way (<file>.corrupt, then
+    .corrupt.1, ...) so starting a fresh store never overwrites it.
+    """
+    backup = path + ".corrupt"
+    n = 0
+    while os.path.exists(backup):
+        n += 1
+        backup = f"{path}.corrupt.{n}"
+    os.replace(path, backup)
+    print(f"[WARN] Corrupt concept knowledge file moved to {backup}")
+
+
+class _TopicStore:
+    """
+    In-memory view of one topic file, indexed by normalized concept name.
+    Built once per topic; every lookup after that is a dict hit.
+    """
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self.path = _topic_path(topic)
+        self.pending = 0
+        self.index = {}
+
+        data = None
+        if os.path.exists(self.path):
+            # an unreadable file raises (OSError) rather than being
+            # replaced by an empty store on the next flush
+            with open(self.path, "r", encoding="utf-8") as f:
+                try:
+                    data = json.load(f)
+                except ValueError:
+                    data = None
+            if not _valid(data):
+                _set_aside(self.path)
+                data = None
+
+        if data is None:
+            data = {
+                "topic": topic,
+                "generated_at": datetime.utcnow().isoformat(),
+                "concepts": []
+            }
+
+        self.data = data
+        for i, c in enumerate(data["concepts"]):
+            if isinstance(c, dict) and c.get("concept"):
+                self.index.setdefault(normalize_concept_name(c["concept"]), i)
+
+    def get(self, concept: str):
+        i = self.index.get(normalize_concept_name(concept))
+        return None if i is None else self.data["concepts"][i]
+
+    def put(self, concept_knowledge: dict):
+        key = normalize_concept_name(concept_knowledge["concept"])
+        i = self.index.get(key)
+
+        if i is not None:
+            existing = self.data["concepts"][i]
+            # Update existing concept instead of creating duplicate
+            self.data["concepts"][i] = concept_knowledge
+            print(f"[DEDUP] Merged '{concept_knowledge['concept']}' with existing '{existing['concept']}'")
+        else:
+            self.index[key] = len(self.data["concepts"])
+            self.data["concepts"].append(concept_knowledge)
+
+        self.pending += 1
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        os.makedirs(BASE_DIR, exist_ok=True)
+
+        # write-temp-then-rename: readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=BASE_DIR, prefix=".tmp_", suffix=".json"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        get_knowledge_base().upsert_knowledge(self.topic, self.data["concepts"])
+        self.pending = 0
+
+
+_stores = {}
+_lock = threading.RLock()
+
+
+def _store(topic: str) -> _TopicStore:
+    key = topic.lower().replace(" ", "_")
+    store = _stores.get(key)
+    if store is None:
+        store = _TopicStore(topic)
+        _stores[key] = store
+    return store
+
+
 def load_concept_knowledge(topic: str, concept: str):
     """
     Load knowledge for a single concept if it exists.
     Uses stemming to match concepts (e.g., "Delete" matches "Deletion").
     Returns None if not found.
     """
-    path = _topic_path(topic)
+    with _lock:
+        return _store(topic).get(concept)
 
-    if not os.path.exists(path):
-        return None
 
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+def save_concept_knowledge(topic: str, concept_knowledge: dict):
+    """
+    Append or update concept knowledge inside topic file.
+    Writes are batched; call flush_concept_knowledge() to persist now.
+    """
+    with _lock:
+        store = _store(topic)
+        store.put(concept_knowledge)
+        if store.pending >= FLUSH_EVERY:
+            store.flush()
 
-        normalized_input = normalize_concept_name(concept)
-        for c in data.get("concepts", []):
-            if normalize_concept_name(c["concept"]) == normalized_input:
-                return c
 
-    except Exception:
-        return None
+def flush_concept_knowledge(topic: str = None):
+    """
+    Persist buffered saves for one topic (or every topic if None).
+    """
+    with _lock:
+        if topic is None:
+            stores = list(_stores.values())
+        else:
+            stores = [_store(topic)]
 
-    return None
+        for store in stores:
+            store.flush()
 
 
-def save_concept_knowledge(topic: str, concept_knowledge: dict):
+def release_concept_knowledge(topic: str):
     """
-    Append or update concept knowledge inside topic file.
+    Flush one topic's store and drop it from memory (end of a topic run,
+    so long batch runs don't keep every topic loaded).
     """
-    os.makedirs(BASE_DIR, exist_ok=True)
-    path = _topic_path(topic)
-
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    else:
-        data = {
-            "topic": topic,
-            "generated_at": datetime.utcnow().isoformat(),
-            "concepts": []
-        }
-
-    # Replace if exists (using stemming to detect duplicates)
-    updated = False
-    normalized_input = normalize_concept_name(concept_knowledge["concept"])
-    
-    for i, c in enumerate(data["concepts"]):
-        if normalize_concept_name(c["concept"]) == normalized_input:
-            # Update existing concept instead of creating duplicate
-            data["concepts"][i] = concept_knowledge
-            updated = True
-            print(f"[DEDUP] Merged '{concept_knowledge['concept']}' with existing '{c['concept']}'")
-            break
+    key = topic.lower().replace(" ", "_")
+    with _lock:
+        store = _stores.get(key)
+        if store is not None:
+            store.flush()
+            del _stores[key]
 
-    if not updated:
-        data["concepts"].append(concept_knowledge)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+atexit.register(flush_concept_knowledge)
@@ -0,0 +1,348 @@
+"""
+Embedded SQLite knowledge base shared by every storage writer.
+
+Tables: sources, concepts, knowledge, atoms. All rows carry a topic key
+(same slug as the JSON file names) and, where relevant, the stemmed
+concept name from normalize_concept_name, both indexed, so cross-topic
+queries such as "all atoms for concept X" are single index lookups.
+
+The per-topic JSON files under output/ are still written by the store
+modules; export_atom_feed() rebuilds the visual/ feed format from here.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from process.concept_normalizer import normalize_concept_name
+from process.models import Atom, Concept
+
+DB_PATH = os.path.join("output", "scrolla.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    source TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    raw_text TEXT NOT NULL,
+    UNIQUE (topic_key, source)
+);
+
+CREATE TABLE IF NOT EXISTS concepts (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    type TEXT,
+    confidence REAL
+);
+
+CREATE TABLE IF NOT EXISTS knowledge (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    concept TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    type TEXT,
+    body TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (topic_key, normalized_name)
+);
+
+CREATE TABLE IF NOT EXISTS atoms (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    concept TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    atom_type TEXT,
+    content TEXT NOT NULL,
+    difficulty TEXT,
+    estimated_read_time_sec INTEGER,
+    position INTEGER,
+    extra TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_sources_topic ON sources(topic_key);
+CREATE INDEX IF NOT EXISTS idx_concepts_topic ON concepts(topic_key);
+CREATE INDEX IF NOT EXISTS idx_concepts_name ON concepts(normalized_name);
+CREATE INDEX IF NOT EXISTS idx_knowledge_name ON knowledge(normalized_name, type);
+CREATE INDEX IF NOT EXISTS idx_atoms_topic ON atoms(topic_key, position);
+CREATE INDEX IF NOT EXISTS idx_atoms_name ON atoms(normalized_name);
+"""
+
+
+def topic_key(topic: str) -> str:
+    return topic.replace(" ", "_").lower()
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+class KnowledgeBase:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # ---------------------------------------------------------
+    # Bulk writes (one transaction per call)
+    # ---------------------------------------------------------
+
+    def save_source(self, topic: str, source: str, raw_text: str, fetched_at=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources "
+                "(topic_key, topic, source, fetched_at, raw_text) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (topic_key(topic), topic, source, fetched_at or _now(), raw_text or "")
+            )
+
+    def replace_concepts(self, topic: str, concepts: list):
+        key = topic_key(topic)
+        rows = []
+        for i, c in enumerate(concepts):
+            c = Concept.coerce(c)
+            rows.append((
+                key,
+                topic,
+                i,
+                c.concept,
+                normalize_concept_name(c.concept),
+                c.type,
+                c.confidence
+            ))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM concepts WHERE topic_key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO concepts "
+                "(topic_key, topic, position, name, normalized_name, type, confidence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def upsert_knowledge(self, topic: str, concept_knowledge_list: list):
+        key = topic_key(topic)
+        now = _now()
+        rows = [
+            (
+                key,
+                topic,
+                ck["concept"],
+                normalize_concept_name(ck["concept"]),
+                ck.get("type"),
+                json.dumps(ck, ensure_ascii=False),
+                now
+            )
+            for ck in concept_knowledge_list
+            if ck and ck.get("concept")
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO knowledge "
+                "(topic_key, topic, concept, normalized_name, type, body, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def replace_atoms(self, topic: str, atoms: list):
+        key = topic_key(topic)
+        rows = []
+        for i, a in enumerate(atoms):
+            a = Atom.coerce(a)
+            rows.append((
+                key,
+                topic,
+                a.concept,
+                normalize_concept_name(a.concept),
+                a.atom_type,
+                a.content,
+                a.difficulty,
+                a.estimated_read_time_sec,
+                a.order or i + 1,
+                json.dumps(a.extra, ensure_ascii=False) if a.extra else None
+            ))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM atoms WHERE topic_key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO atoms "
+                "(topic_key, topic, concept, normalized_name, atom_type, content, "
+                "difficulty, estimated_read_time_sec, position, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    # ---------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------
+
+    def topics(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT topic FROM atoms "
+                "UNION SELECT DISTINCT topic FROM concepts ORDER BY 1"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def sources_for_topic(self, topic: str) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, raw_text FROM sources WHERE topic_key = ?",
+                (topic_key(topic),)
+            ).fetchall()
+        return {r["source"]: r["raw_text"] for r in rows}
+
+    def concepts_for_topic(self, topic: str):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, type, confidence FROM concepts "
+                "WHERE topic_key = ? ORDER BY position",
+                (topic_key(topic),)
+            ).fetchall()
+        concepts = []
+        for r in rows:
+            c = {"concept": r["name"], "type": r["type"]}
+            if r["confidence"] is not None:
+                c["confidence"] = r["confidence"]
+            concepts.append(c)
+        return concepts
+
+    def knowledge_for_concept(self, concept: str, concept_type=None, topic=None):
+        """
+        Knowledge rows matching the stemmed concept name across topics,
+        newest first. Each row is the stored dict plus its "topic".
+        """
+        sql = "SELECT topic, body FROM knowledge WHERE normalized_name = ?"
+        args = [normalize_concept_name(concept)]
+        if concept_type:
+            sql += " AND type = ?"
+            args.append(concept_type)
+        if topic:
+            sql += " AND topic_key = ?"
+            args.append(topic_key(topic))
+        sql += " ORDER BY updated_at DESC"
+
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+
+        results = []
+        for r in rows:
+            ck = json.loads(r["body"])
+            ck.setdefault("topic", r["topic"])
+            results.append(ck)
+        return results
+
+    def knowledge_names(self):
+        """
+        Lightweight (topic, concept, normalized_name, type) rows for
+        building in-memory indexes without loading knowledge bodies.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topic, concept, normalized_name, type FROM knowledge"
+            ).fetchall()
+        return [tuple(r) for r in rows]
+
+    def atoms_for_topic(self, topic: str):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM atoms WHERE topic_key = ? ORDER BY position",
+                (topic_key(topic),)
+            ).fetchall()
+        return [self._atom_from_row(r) for r in rows]
+
+    def atoms_for_concept(self, concept: str, atom_type=None):
+        sql = "SELECT * FROM atoms WHERE normalized_name = ?"
+        args = [normalize_concept_name(concept)]
+        if atom_type:
+            sql += " AND atom_type = ?"
+            args.append(atom_type)
+        sql += " ORDER BY topic_key, position"
+
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [self._atom_from_row(r) for r in rows]
+
+    def iter_atoms(self, batch_size=1000):
+        """
+        Every stored atom in insertion order (each topic's feed is
+        written in one go, so topics stay contiguous), fetched in
+        batches so the whole catalogue is never held in memory.
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM atoms WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            for r in rows:
+                yield self._atom_from_row(r)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def _atom_from_row(r):
+        atom = {
+            "topic": r["topic"],
+            "concept": r["concept"],
+            "atom_type": r["atom_type"],
+            "content": r["content"],
+            "difficulty": r["difficulty"],
+            "estimated_read_time_sec": r["estimated_read_time_sec"],
+            "order": r["position"]
+        }
+        if r["extra"]:
+            atom.update(json.loads(r["extra"]))
+        return atom
+
+    # ---------------------------------------------------------
+    # JSON export (visual/ feed format)
+    # ---------------------------------------------------------
+
+    def export_atom_feed(self, topic: str, path=None) -> dict:
+        feed = {
+            "topic": topic,
+            "atoms": self.atoms_for_topic(topic)
+        }
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(feed, f, indent=2, ensure_ascii=False)
+        return feed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---------------------------------------------------------
+# Shared default instance
+# ---------------------------------------------------------
+
+_kb = None
+_kb_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    global _kb
+    with _kb_lock:
+        if _kb is None:
+            _kb = KnowledgeBase()
+        return _kb
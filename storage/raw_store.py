@@ -1,16 +1,20 @@
 import json, os
 from datetime import datetime
+from storage.knowledge_base import get_knowledge_base
 
 RAW_DIR = "output/raw_knowledge"
 
 def save_raw(topic: str, text: str):
     os.makedirs(RAW_DIR, exist_ok=True)
     path = os.path.join(RAW_DIR, topic.replace(" ", "_").lower() + ".json")
+    fetched_at = datetime.utcnow().isoformat()
 
     with open(path, "w", encoding="utf-8") as f:
         json.dump({
             "topic": topic,
             "source": "wikipedia",
-            "fetched_at": datetime.utcnow().isoformat(),
+            "fetched_at": fetched_at,
             "raw_text": text
         }, f, indent=2)
+
+    get_knowledge_base().save_source(topic, "wikipedia", text, fetched_at)
@@ -0,0 +1,191 @@
+"""
+Per-topic run manifest for resumable runs.
+
+output/runs/<topic>/manifest.json records every finished stage (sources,
+concepts, atoms) and per-concept unit (knowledge, bundle). Each entry
+keeps the sha256 of its saved payload and of the inputs it was built
+from; a checkpoint is only reused when both still match, so a changed
+upstream (new concept list, edited knowledge) or a truncated payload
+file invalidates exactly the affected units.
+
+Entries are appended to journal.jsonl as they complete (one line each,
+so a run with many units stays linear) and folded into manifest.json
+by compact(), which runs whenever a stage completes. Loading replays
+the journal over the manifest, ignoring a torn last line.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+RUNS_DIR = os.path.join("output", "runs")
+
+
+def content_hash(value) -> str:
+    """
+    Stable sha256 of any JSON-serializable value.
+    """
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def atomic_write_json(path, value):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class RunManifest:
+    def __init__(self, topic: str, directory=RUNS_DIR):
+        self.topic = topic
+        self.directory = os.path.join(directory, topic.replace(" ", "_").lower())
+        self.path = os.path.join(self.directory, "manifest.json")
+        self.journal_path = os.path.join(self.directory, "journal.jsonl")
+        self._lock = threading.RLock()
+        self._torn = False
+        self.data = self._load()
+        if self._torn:
+            # new lines must not be appended after a partial one
+            self.compact()
+
+    def _empty(self):
+        return {
+            "topic": self.topic,
+            "started_at": datetime.utcnow().isoformat(),
+            "stages": {},
+            "units": {}
+        }
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if (
+            not isinstance(data, dict)
+            or not isinstance(data.get("stages"), dict)
+            or not isinstance(data.get("units"), dict)
+        ):
+            data = self._empty()
+
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        data[record["table"]][record["key"]] = record["entry"]
+                    except (ValueError, KeyError, TypeError):
+                        # torn write at a crash; later lines can't exist
+                        self._torn = True
+                        break
+                    data["updated_at"] = record["entry"].get("completed_at")
+        except OSError:
+            pass
+        return data
+
+    def reset(self):
+        """
+        Forget every checkpoint (fresh, non-resumed run).
+        """
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.data = self._empty()
+
+    # ---------------------------------------------------------
+    # Payload files
+    # ---------------------------------------------------------
+
+    def _payload_path(self, name):
+        return os.path.join(self.directory, name + ".json")
+
+    def _read_checked(self, entry, name, inputs_hash):
+        if not entry:
+            return None
+        if inputs_hash is not None and entry.get("inputs") != inputs_hash:
+            return None
+        try:
+            with open(self._payload_path(name), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if content_hash(payload) != entry.get("hash"):
+            return None
+        return payload
+
+    def _record(self, table, key, name, payload, inputs_hash):
+        entry = {
+            "hash": content_hash(payload),
+            "inputs": inputs_hash,
+            "completed_at": datetime.utcnow().isoformat()
+        }
+        with self._lock:
+            atomic_write_json(self._payload_path(name), payload)
+            self.data[table][key] = entry
+            self.data["updated_at"] = entry["completed_at"]
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(
+                    {"table": table, "key": key, "entry": entry},
+                    ensure_ascii=False
+                ) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self):
+        """
+        Fold the journal into manifest.json and start a new journal.
+        """
+        with self._lock:
+            if not os.path.exists(self.journal_path):
+                return
+            atomic_write_json(self.path, self.data)
+            os.remove(self.journal_path)
+
+    # ---------------------------------------------------------
+    # Stages and units
+    # ---------------------------------------------------------
+
+    def stage(self, name: str, inputs_hash=None):
+        """
+        Payload of a finished stage, or None if missing or invalidated.
+        """
+        with self._lock:
+            entry = self.data["stages"].get(name)
+            return self._read_checked(entry, name, inputs_hash)
+
+    def complete_stage(self, name: str, payload, inputs_hash=None):
+        self._record("stages", name, name, payload, inputs_hash)
+        self.compact()
+
+    def _unit_name(self, kind, key):
+        return os.path.join(kind, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def unit(self, kind: str, key: str, inputs_hash=None):
+        """
+        Payload of a finished per-concept unit, or None.
+        """
+        with self._lock:
+            entry = self.data["units"].get(f"{kind}:{key}")
+            return self._read_checked(entry, self._unit_name(kind, key), inputs_hash)
+
+    def complete_unit(self, kind: str, key: str, payload, inputs_hash=None):
+        self._record("units", f"{kind}:{key}", self._unit_name(kind, key), payload, inputs_hash)
+
+    def summary(self):
+        with self._lock:
+            counts = {}
+            for key in self.data["units"]:
+                kind = key.split(":", 1)[0]
+                counts[kind] = counts.get(kind, 0) + 1
+            return {"stages": sorted(self.data["stages"]), "units": counts}
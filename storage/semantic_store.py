@@ -1,9 +1,12 @@
 import json, os
 from datetime import datetime
+from process.models import Concept
+from storage.knowledge_base import get_knowledge_base
 
 SEM_DIR = "output/semantic_knowledge"
 
 def save_semantic(topic: str, concepts: list):
+    concepts = [Concept.coerce(c) for c in concepts]
     os.makedirs(SEM_DIR, exist_ok=True)
     path = os.path.join(SEM_DIR, topic.replace(" ", "_").lower() + ".json")
 
@@ -11,5 +14,7 @@ def save_semantic(topic: str, concepts: list):
         json.dump({
             "topic": topic,
             "generated_at": datetime.utcnow().isoformat(),
-            "concepts": concepts
+            "concepts": [c.to_dict() for c in concepts]
         }, f, indent=2)
+
+    get_knowledge_base().replace_concepts(topic, concepts)
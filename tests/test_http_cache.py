@@ -0,0 +1,175 @@
+"""
+Source fetching against a local stub server (no network needed).
+
+Covers the disk cache in input/http_cache.py (200 stored, conditional
+GET answered with 304, fresh entries served without a request) and the
+per-source deadline in input/source_fetcher.fetch_all_sources.
+Run with: python -m pytest tests/
+"""
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from input import http_cache, open_textbook_fetch, reference_readers, source_fetcher
+
+PAGE = "Heaps are complete binary trees that keep the smallest key on top."
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+        route = server.routes.get(self.path.split("?")[0])
+        if route is None:
+            self.send_text(404, "not found")
+        else:
+            route(self)
+
+    def send_text(self, status, text, headers=None):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_not_modified(self):
+        self.send_response(304)
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # abandoned slow requests write to closed sockets
+        pass
+
+
+class _StubServer:
+    def __init__(self, routes):
+        self.httpd = _QuietServer(("127.0.0.1", 0), _StubHandler)
+        self.httpd.routes = routes
+        self.httpd.requests = []
+        self.httpd.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self.httpd
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _conditional_page(handler):
+    if handler.headers.get("If-None-Match") == ETAG:
+        handler.send_not_modified()
+    else:
+        handler.send_text(200, PAGE, {"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+
+
+class _CacheDirTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(http_cache, "CACHE_DIR", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+
+class CachedGetTest(_CacheDirTest):
+
+    def test_200_is_stored_then_revalidated_with_304(self):
+        stub = _StubServer({"/page": _conditional_page})
+        with stub as httpd:
+            url = stub.base + "/page"
+            self.assertEqual(http_cache.cached_get(url, fresh_for=0), (200, PAGE))
+            self.assertEqual(http_cache.cached_get(url, fresh_for=0), (200, PAGE))
+
+        self.assertEqual(len(httpd.requests), 2)
+        first, second = (headers for _, headers in httpd.requests)
+        self.assertNotIn("If-None-Match", first)
+        self.assertEqual(second.get("If-None-Match"), ETAG)
+        self.assertEqual(second.get("If-Modified-Since"), LAST_MODIFIED)
+
+    def test_fresh_entry_is_served_without_a_request(self):
+        stub = _StubServer({"/page": _conditional_page})
+        with stub as httpd:
+            url = stub.base + "/page"
+            http_cache.cached_get(url)
+            self.assertEqual(http_cache.cached_get(url, fresh_for=60), (200, PAGE))
+        self.assertEqual(len(httpd.requests), 1)
+
+    def test_errors_are_not_stored(self):
+        stub = _StubServer({})
+        with stub as httpd:
+            url = stub.base + "/missing"
+            self.assertEqual(http_cache.cached_get(url)[0], 404)
+            self.assertEqual(http_cache.cached_get(url)[0], 404)
+        self.assertEqual(len(httpd.requests), 2)
+
+
+class FetchAllSourcesTest(_CacheDirTest):
+
+    def test_slow_source_times_out_while_others_return(self):
+        release = threading.Event()
+
+        def slow(handler):
+            release.wait(5)
+            handler.send_text(200, "too late")
+
+        textbook = "\n".join([
+            "<h1>Open Data Structures</h1>",
+            "A binary heap stores a complete binary tree in a plain array.",
+        ])
+        stub = _StubServer({
+            "/slow": slow,
+            "/ods/": lambda h: h.send_text(200, textbook),
+            "/gfg/binary-heap/": lambda h: h.send_text(200, PAGE),
+        })
+        with stub:
+            with mock.patch.object(
+                source_fetcher, "fetch_wikipedia_text",
+                lambda topic: http_cache.cached_get(stub.base + "/slow", timeout=10)[1]
+            ), mock.patch.object(
+                open_textbook_fetch, "OPEN_DS_URL", stub.base + "/ods/"
+            ), mock.patch.object(
+                reference_readers, "GEEKSFORGEEKS_URL", stub.base + "/gfg/{slug}/"
+            ):
+                start = time.monotonic()
+                wiki, book, refs = source_fetcher.fetch_all_sources(
+                    "binary heap", timeouts={"wikipedia": 0.5}
+                )
+                elapsed = time.monotonic() - start
+            release.set()
+
+        self.assertEqual(wiki, "")
+        self.assertEqual(book, "A binary heap stores a complete binary tree in a plain array.")
+        self.assertEqual(refs["geeksforgeeks"], PAGE)
+        self.assertLess(elapsed, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
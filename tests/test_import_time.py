@@ -0,0 +1,65 @@
+"""
+Importing the entry points must stay cheap: the embedding model, NLTK
+and the scientific stack load on first use, not at import time.
+Each import runs in a fresh interpreter so earlier tests can't hide it.
+"""
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_SEC = 1.0
+
+# model / NLP stack; loaded on first use only
+HEAVY_MODULES = [
+    "sentence_transformers",
+    "torch",
+    "sklearn",
+    "scipy",
+    "nltk",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "loaded": [m for m in {heavy!r} if m in sys.modules]
+}}))
+"""
+
+
+def _probe(module, heavy=HEAVY_MODULES):
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=heavy)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def test_main_import_is_light(self):
+        # the pipeline without concept intelligence needs no numpy either
+        result = _probe("main", HEAVY_MODULES + ["numpy"])
+        self.assertEqual(result["loaded"], [])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_SEC)
+
+    def test_normalizers_import_lazily(self):
+        for module in ("process.concept_normalizer", "intelligence.semantic_normalizer"):
+            with self.subTest(module=module):
+                result = _probe(module)
+                self.assertEqual(result["loaded"], [])
+                self.assertLess(result["elapsed"], IMPORT_BUDGET_SEC)
+
+
+if __name__ == "__main__":
+    unittest.main()
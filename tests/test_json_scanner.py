@@ -0,0 +1,64 @@
+"""
+Tolerant JSON scanning: repairs, truncation handling and stats.
+"""
+import unittest
+
+from process import json_scanner
+from process.json_scanner import JSONScanError, loads_tolerant, repair_stats, scan_json
+from process.text_utils import JsonCompletionDetector
+
+
+def _stats_delta(before):
+    after = repair_stats()
+    return {k: after.get(k, 0) - before.get(k, 0) for k in after if after.get(k, 0) != before.get(k, 0)}
+
+
+class ScanJsonTest(unittest.TestCase):
+
+    def test_repairs_common_defects(self):
+        value, repairs = scan_json("Sure!\n```json\n{'a': [1, 2,], b: True}\n```")
+        self.assertEqual(value, {"a": [1, 2], "b": True})
+        for repair in ("code_fence", "leading_text", "single_quotes",
+                       "trailing_comma", "unquoted_keys", "python_literals"):
+            self.assertIn(repair, repairs)
+
+    def test_truncated_value_is_rejected(self):
+        before = repair_stats()
+        with self.assertRaises(JSONScanError):
+            loads_tolerant('{"concepts": [{"name": "A", "type": "Def')
+        delta = _stats_delta(before)
+        self.assertEqual(delta.get("failed"), 1)
+        self.assertNotIn("parsed", delta)
+
+    def test_truncated_value_on_request(self):
+        value, repairs = scan_json('[{"a": 1}, {"b": 2', allow_truncated=True)
+        self.assertEqual(value, [{"a": 1}, {"b": 2}])
+        self.assertIn("truncated", repairs)
+
+    def test_detector_does_not_touch_stats(self):
+        before = repair_stats()
+        detector = JsonCompletionDetector()
+        for piece in ['Here: {"a": ', '[1, 2]', '} trailing']:
+            done = detector.feed(piece)
+        self.assertTrue(done)
+        self.assertEqual(detector.value_text(), 'Here: {"a": [1, 2]}')
+        self.assertEqual(_stats_delta(before), {})
+
+        loads_tolerant(detector.value_text())
+        self.assertEqual(_stats_delta(before), {"parsed": 1, "leading_text": 1})
+
+    def test_detector_skips_unparseable_brackets(self):
+        detector = JsonCompletionDetector()
+        self.assertFalse(detector.feed("see [note] then "))
+        self.assertTrue(detector.feed('{"ok": 1}'))
+        self.assertEqual(json_scanner.loads_tolerant(detector.value_text()), {"ok": 1})
+
+    def test_detector_ignores_openers_of_the_wrong_kind(self):
+        detector = JsonCompletionDetector(expect="{")
+        self.assertFalse(detector.feed("Based on source [1], here it is:\n"))
+        self.assertTrue(detector.feed('{"ok": [1]}'))
+        self.assertEqual(loads_tolerant(detector.value_text(), expect="{"), {"ok": [1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,326 @@
+"""
+OllamaClient against a local stub server (no Ollama needed).
+
+Covers retry on 5xx, the in-flight cap, closing the stream at the end of
+the first JSON value, cancellation before and during a request, and the
+response cache (unusable replies are not replayed).
+Run with: python -m pytest tests/
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from process import llm_client
+from process.knowledge_extractor import extract_concept_knowledge
+from process.llm_cache import LLMResponseCache
+from process.llm_client import LLMCancelled, LLMError, OllamaClient
+from process.llm_extractor import extract_concepts_llm
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests.append(json.loads(body))
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            server.behaviour(self)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    # helpers for behaviours
+    def send_json(self, status, value):
+        data = json.dumps(value).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def send_event(self, text, done=False):
+        # one NDJSON line per HTTP chunk, like Ollama
+        line = (json.dumps({"response": text, "done": done}) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class _StubServer:
+    def __init__(self, behaviour):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.behaviour = behaviour
+        self.httpd.requests = []
+        self.httpd.lock = threading.Lock()
+        self.httpd.active = 0
+        self.httpd.peak = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/api/generate"
+
+    def __enter__(self):
+        self.thread.start()
+        return self.httpd
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault("retries", 2)
+    kwargs.setdefault("timeout", 5)
+    return OllamaClient(
+        url=server.url,
+        backoff_base=0.0,
+        cache=None,
+        **kwargs
+    )
+
+
+class OllamaClientTest(unittest.TestCase):
+
+    def test_retries_5xx_then_succeeds(self):
+        calls = []
+
+        def behaviour(handler):
+            calls.append(1)
+            if len(calls) < 3:
+                handler.send_json(503, {"error": "overloaded"})
+            else:
+                handler.send_json(200, {"response": "ok", "done": True})
+
+        stub = _StubServer(behaviour)
+        with stub as httpd:
+            client = _client(stub)
+            self.assertEqual(client.generate("hi"), "ok")
+            client.close()
+        self.assertEqual(len(httpd.requests), 3)
+        self.assertFalse(httpd.requests[0]["stream"])
+
+    def test_gives_up_after_retries(self):
+        stub = _StubServer(lambda h: h.send_json(500, {"error": "boom"}))
+        with stub as httpd:
+            client = _client(stub, retries=1)
+            with self.assertRaises(LLMError):
+                client.generate("hi")
+            client.close()
+        self.assertEqual(len(httpd.requests), 2)
+
+    def test_client_error_is_not_retried(self):
+        stub = _StubServer(lambda h: h.send_json(404, {"error": "no model"}))
+        with stub as httpd:
+            client = _client(stub)
+            with self.assertRaises(Exception):
+                client.generate("hi")
+            client.close()
+        self.assertEqual(len(httpd.requests), 1)
+
+    def test_in_flight_cap(self):
+        def behaviour(handler):
+            time.sleep(0.1)
+            handler.send_json(200, {"response": "ok", "done": True})
+
+        stub = _StubServer(behaviour)
+        with stub as httpd:
+            client = _client(stub, max_in_flight=2)
+            threads = [
+                threading.Thread(target=client.generate, args=(f"p{i}",))
+                for i in range(6)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            client.close()
+        self.assertEqual(len(httpd.requests), 6)
+        self.assertLessEqual(httpd.peak, 2)
+
+    def test_stream_stops_at_end_of_json_value(self):
+        def behaviour(handler):
+            handler.start_stream()
+            handler.send_event('Sure: {"a": [1, ')
+            handler.send_event('2], "b": "}"}')
+            # chatter the client must not wait for
+            for _ in range(50):
+                handler.send_event(" and some more text")
+                time.sleep(0.05)
+            handler.send_event("", done=True)
+            handler.end_stream()
+
+        stub = _StubServer(behaviour)
+        with stub as httpd:
+            client = _client(stub)
+            start = time.perf_counter()
+            text = client.generate("hi", stop_at_json=True)
+            elapsed = time.perf_counter() - start
+            client.close()
+        self.assertEqual(text, 'Sure: {"a": [1, 2], "b": "}"}')
+        self.assertLess(elapsed, 1.0)
+        self.assertTrue(httpd.requests[0]["stream"])
+
+    def test_stream_waits_for_expected_value_kind(self):
+        def behaviour(handler):
+            handler.start_stream()
+            handler.send_event("Based on source [1], here it is:\n")
+            handler.send_event('{"a": 1}')
+            handler.send_event(" trailing", done=True)
+            handler.end_stream()
+
+        stub = _StubServer(behaviour)
+        with stub:
+            client = _client(stub)
+            text = client.generate("hi", stop_at_json="{")
+            client.close()
+        self.assertEqual(text, 'Based on source [1], here it is:\n{"a": 1}')
+
+    def test_stream_without_json_returns_full_text(self):
+        def behaviour(handler):
+            handler.start_stream()
+            handler.send_event("no json ")
+            handler.send_event("here", done=True)
+            handler.end_stream()
+
+        stub = _StubServer(behaviour)
+        with stub:
+            client = _client(stub)
+            self.assertEqual(client.generate("hi", stop_at_json=True), "no json here")
+            client.close()
+
+    def test_cancel_before_request(self):
+        stub = _StubServer(lambda h: h.send_json(200, {"response": "ok"}))
+        cancel = threading.Event()
+        cancel.set()
+        with stub as httpd:
+            client = _client(stub)
+            with self.assertRaises(LLMCancelled):
+                client.generate("hi", stop_at_json=True, cancel_event=cancel)
+            client.close()
+        self.assertEqual(httpd.requests, [])
+
+    def test_cancel_during_stream(self):
+        def behaviour(handler):
+            handler.start_stream()
+            for _ in range(100):
+                handler.send_event("thinking ")
+                time.sleep(0.05)
+            handler.end_stream()
+
+        stub = _StubServer(behaviour)
+        cancel = threading.Event()
+        with stub:
+            client = _client(stub)
+            threading.Timer(0.2, cancel.set).start()
+            start = time.perf_counter()
+            with self.assertRaises(LLMCancelled):
+                client.generate("hi", stop_at_json=True, cancel_event=cancel)
+            elapsed = time.perf_counter() - start
+            client.close()
+        self.assertLess(elapsed, 1.5)
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMResponseCache(os.path.join(self.tmp.name, "cache.sqlite3"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_invalidate_drops_cached_response(self):
+        stub = _StubServer(lambda h: h.send_json(200, {"response": "ok", "done": True}))
+        with stub as httpd:
+            client = OllamaClient(url=stub.url, backoff_base=0.0, cache=self.cache)
+            client.generate("hi")
+            client.generate("hi")
+            self.assertEqual(len(httpd.requests), 1)
+
+            client.invalidate("hi")
+            client.generate("hi")
+            client.close()
+        self.assertEqual(len(httpd.requests), 2)
+
+    def test_unparseable_reply_is_not_replayed(self):
+        replies = ["Sorry, I cannot", '{"concept": "Heap", "knowledge": {}}']
+
+        def behaviour(handler):
+            handler.start_stream()
+            handler.send_event(replies[min(len(httpd.requests), 2) - 1], done=True)
+            handler.end_stream()
+
+        stub = _StubServer(behaviour)
+        with stub as httpd:
+            llm_client.configure(url=stub.url, backoff_base=0.0, cache=self.cache)
+            try:
+                first = extract_concept_knowledge("Heaps", "Heap", "Definition", {})
+                second = extract_concept_knowledge("Heaps", "Heap", "Definition", {})
+                third = extract_concept_knowledge("Heaps", "Heap", "Definition", {})
+            finally:
+                llm_client.configure(cache=None)
+        self.assertIsNone(first)
+        self.assertEqual(second["concept"], "Heap")
+        self.assertEqual(third, second)
+        # the failure was asked again, the good reply came from the cache
+        self.assertEqual(len(httpd.requests), 2)
+
+    def test_running_totals_drive_eviction(self):
+        self.cache.max_entries = 3
+        for i in range(5):
+            self.cache.put(f"k{i}", "m", "x" * 10)
+        self.cache.put("k4", "m", "y" * 4)
+        self.cache.delete("k3")
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["bytes"], 14)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertIsNone(self.cache.get("k0"))
+        self.assertEqual(self.cache.get("k4"), "y" * 4)
+
+
+class ConceptExtractionTest(unittest.TestCase):
+
+    def test_malformed_records_are_dropped(self):
+        reply = {"concepts": [
+            {"name": None, "type": "Definition"},
+            {"name": "Heap", "type": 3},
+            {"name": "  ", "type": "Definition"},
+            {"name": "Heapify", "type": "Operation"}
+        ]}
+        stub = _StubServer(lambda h: h.send_json(200, {"response": json.dumps(reply)}))
+        with stub:
+            llm_client.configure(url=stub.url, backoff_base=0.0, cache=None, stream_json=False)
+            try:
+                result = extract_concepts_llm("Heaps", "A heap is a tree.")
+            finally:
+                llm_client.configure(cache=None)
+        self.assertEqual(result["concepts"], [{"name": "Heapify", "type": "Operation"}])
+
+
+if __name__ == "__main__":
+    unittest.main()